@@ -0,0 +1,24 @@
+"""Environment settings for the food ordering agent.
+
+Values are read once at import, after loading `.env`, so the order path does
+not hit `os.environ` on every request.
+"""
+import os
+
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+APTOS_NODE_URL = os.environ.get(
+    'APTOS_NODE_URL', 'https://fullnode.devnet.aptoslabs.com'
+)
+HOST_AGENT_APTOS_ADDRESS = os.environ.get('HOST_AGENT_APTOS_ADDRESS')
+
+# Aptos network name used in explorer links
+if 'mainnet' in APTOS_NODE_URL:
+    NETWORK_NAME = 'mainnet'
+elif 'testnet' in APTOS_NODE_URL:
+    NETWORK_NAME = 'testnet'
+else:
+    NETWORK_NAME = 'devnet'
@@ -1,8 +1,7 @@
-import json
+import asyncio
 import logging
 import random
-import os
-import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Optional, List, Dict
 
@@ -12,21 +11,36 @@ from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.tools.tool_context import ToolContext
+from _env import HOST_AGENT_APTOS_ADDRESS, NETWORK_NAME
 from task_manager import AgentWithTaskManager
 # Import Aptos related libraries
 from common.aptos_config import AptosConfig
 from common.aptos_blockchain import AptosTaskManager
+from common.utils.blockchain_loop import get_blockchain_loop
+from common.utils.fast_json import json_dumps, json_loads
 
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
-# Local cache of created order_ids for demo purposes.
-order_ids = set()
+
+# Aptos explorer link pieces, fixed for the lifetime of the process
+_EXPLORER_TXN_URL = 'https://explorer.aptoslabs.com/txn/'
+_EXPLORER_NETWORK_QUERY = f'?network={NETWORK_NAME}'
+
+# Local cache of created order_ids for demo purposes, bounded so it does not
+# grow for the lifetime of the process (oldest ids are evicted first).
+_MAX_ORDER_IDS = 10_000
+order_ids: OrderedDict[str, None] = OrderedDict()
 
 # Global reference to the current agent instance for tool functions
 _current_agent_instance = None
 
+# AptosTaskManager shared by all orders on the blockchain loop, so its
+# RestClient keeps pooled connections to the Aptos node
+_aptos_task_manager: Optional[AptosTaskManager] = None
+
+
 # Sample restaurant database for Bay Area
 RESTAURANTS = {
     "pizza": [
@@ -66,6 +80,51 @@ RESTAURANTS = {
     ]
 }
 
+# Flattened view of RESTAURANTS sorted by rating (highest first), with
+# parallel columns for the fields search_restaurants filters on.
+_SORTED_ENTRIES = sorted(
+    (
+        (category, restaurant)
+        for category, restaurants in RESTAURANTS.items()
+        for restaurant in restaurants
+    ),
+    key=lambda entry: entry[1]["rating"],
+    reverse=True,
+)
+_ROWS = tuple(restaurant for _, restaurant in _SORTED_ENTRIES)
+_CATEGORIES = tuple(category for category, _ in _SORTED_ENTRIES)
+_LOCATIONS_LOWER = tuple(restaurant["location"].lower() for restaurant in _ROWS)
+_PRICE_RANGES = tuple(restaurant["price_range"] for restaurant in _ROWS)
+
+# Lowercased city names and the words in them, e.g. "san francisco", "san"
+_LOCATION_KEYS = frozenset(
+    key
+    for location_lower in _LOCATIONS_LOWER
+    for key in (location_lower, *location_lower.split())
+)
+
+
+def _build_index() -> dict[tuple[Optional[str], Optional[str], Optional[str]], list[int]]:
+    """Map (category, location key, price range) to matching row indices.
+    
+    None acts as the wildcard for each filter. A location key maps to every
+    row whose location contains it, matching the substring filter.
+    """
+    index = {}
+    for i, location_lower in enumerate(_LOCATIONS_LOWER):
+        location_keys = [None] + [
+            key for key in _LOCATION_KEYS if key in location_lower
+        ]
+        for category in (None, _CATEGORIES[i]):
+            for location_key in location_keys:
+                for price_range in (None, _PRICE_RANGES[i]):
+                    index.setdefault(
+                        (category, location_key, price_range), []
+                    ).append(i)
+    return index
+
+
+_INDEX = _build_index()
 
 def search_restaurants(
     cuisine: Optional[str] = None,
@@ -82,33 +141,38 @@ def search_restaurants(
     Returns:
         List[Dict[str, Any]]: List of matching restaurants
     """
-    results = []
-    
-    # If cuisine is provided, search only in that category
-    if cuisine and cuisine.lower() in RESTAURANTS:
-        search_categories = [cuisine.lower()]
-    else:
-        # Otherwise search all categories
-        search_categories = RESTAURANTS.keys()
+    category = cuisine.lower() if cuisine else None
+    if category not in RESTAURANTS:
+        # Unknown or missing cuisine: search all categories
+        category = None
+    location_lower = location.lower() if location else None
+    price_range = price_range or None
     
-    for category in search_categories:
-        for restaurant in RESTAURANTS[category]:
-            match = True
-            
-            # Filter by location if provided
-            if location and location.lower() not in restaurant["location"].lower():
-                match = False
-                
-            # Filter by price range if provided
-            if price_range and price_range != restaurant["price_range"]:
-                match = False
-                
-            if match:
-                results.append(restaurant)
+    matches = _INDEX.get((category, location_lower, price_range))
+    if matches is None:
+        if location_lower is None or location_lower in _LOCATION_KEYS:
+            return []
+        # Free-form location text: filter the cuisine/price bucket by substring
+        matches = [
+            i
+            for i in _INDEX.get((category, None, price_range), ())
+            if location_lower in _LOCATIONS_LOWER[i]
+        ]
     
-    # Sort by rating (highest first)
-    results.sort(key=lambda x: x["rating"], reverse=True)
-    return results
+    # Buckets keep the rating order (highest first)
+    return [_ROWS[i] for i in matches]
+
+
+# Default delivery lead time for new order forms
+_DEFAULT_DELIVERY_DELAY = timedelta(minutes=30)
+
+
+def _remember_order_id(order_id: str) -> None:
+    """Record order_id as valid, evicting the oldest id when full."""
+    order_ids[order_id] = None
+    order_ids.move_to_end(order_id)
+    if len(order_ids) > _MAX_ORDER_IDS:
+        order_ids.popitem(last=False)
 
 
 def create_order_form(
@@ -130,16 +194,15 @@ def create_order_form(
     Returns:
         dict[str, Any]: A dictionary containing the order form data
     """
-    order_id = 'order_' + str(random.randint(1000000, 9999999))
-    order_ids.add(order_id)
+    order_id = f'order_{random.getrandbits(28):07x}'
+    _remember_order_id(order_id)
     
-    current_date = datetime.now().strftime("%Y-%m-%d")
+    now = datetime.now()
+    current_date = now.date().isoformat()
     
     # Set default delivery time to 30 minutes from now if not provided
     if not delivery_time:
-        now = datetime.now()
-        future_time = now + timedelta(minutes=30)
-        delivery_time = future_time.strftime("%H:%M")
+        delivery_time = (now + _DEFAULT_DELIVERY_DELAY).strftime("%H:%M")
     
     # Set default special instructions to "none" if not provided
     if special_instructions is None:
@@ -156,6 +219,51 @@ def create_order_form(
     }
 
 
+# JSON schema of the order form, shared by every return_order_form call
+_ORDER_FORM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'restaurant': {
+            'type': 'string',
+            'description': 'Restaurant name',
+            'title': 'Restaurant',
+        },
+        'items': {
+            'type': 'string',
+            'description': 'Food items to order',
+            'title': 'Items',
+        },
+        'delivery_time': {
+            'type': 'string',
+            'description': 'Requested delivery time',
+            'title': 'Delivery Time',
+        },
+        'delivery_address': {
+            'type': 'string',
+            'description': 'Delivery address',
+            'title': 'Delivery Address',
+        },
+        'special_instructions': {
+            'type': 'string',
+            'description': 'Special instructions for the order',
+            'title': 'Special Instructions',
+        },
+        'order_id': {
+            'type': 'string',
+            'description': 'Order ID',
+            'title': 'Order ID',
+        },
+        'date': {
+            'type': 'string',
+            'format': 'date',
+            'description': 'Date of order',
+            'title': 'Date',
+        },
+    },
+    'required': ['restaurant', 'items', 'delivery_address', 'order_id', 'date'],
+}
+
+
 def return_order_form(
     form_data: dict[str, Any],
     tool_context: ToolContext,
@@ -172,59 +280,18 @@ def return_order_form(
         dict[str, Any]: A JSON dictionary for the form response
     """
     if isinstance(form_data, str):
-        form_data = json.loads(form_data)
+        form_data = json_loads(form_data)
 
     tool_context.actions.skip_summarization = True
     tool_context.actions.escalate = True
     
     form_dict = {
         'type': 'form',
-        'form': {
-            'type': 'object',
-            'properties': {
-                'restaurant': {
-                    'type': 'string',
-                    'description': 'Restaurant name',
-                    'title': 'Restaurant',
-                },
-                'items': {
-                    'type': 'string',
-                    'description': 'Food items to order',
-                    'title': 'Items',
-                },
-                'delivery_time': {
-                    'type': 'string',
-                    'description': 'Requested delivery time',
-                    'title': 'Delivery Time',
-                },
-                'delivery_address': {
-                    'type': 'string',
-                    'description': 'Delivery address',
-                    'title': 'Delivery Address',
-                },
-                'special_instructions': {
-                    'type': 'string',
-                    'description': 'Special instructions for the order',
-                    'title': 'Special Instructions',
-                },
-                'order_id': {
-                    'type': 'string',
-                    'description': 'Order ID',
-                    'title': 'Order ID',
-                },
-                'date': {
-                    'type': 'string',
-                    'format': 'date',
-                    'description': 'Date of order',
-                    'title': 'Date',
-                },
-            },
-            'required': ['restaurant', 'items', 'delivery_address', 'order_id', 'date'],
-        },
+        'form': _ORDER_FORM_SCHEMA,
         'form_data': form_data,
         'instructions': instructions,
     }
-    return json.dumps(form_dict)
+    return json_dumps(form_dict)
 
 
 def make_reservation(
@@ -250,7 +317,7 @@ def make_reservation(
     Returns:
         dict[str, Any]: Reservation confirmation details
     """
-    reservation_id = 'rsv_' + str(random.randint(1000000, 9999999))
+    reservation_id = f'rsv_{random.getrandbits(28):07x}'
     
     # Simulate successful reservation
     return {
@@ -266,7 +333,7 @@ def make_reservation(
     }
 
 
-def place_order(order_id: str, tool_context: ToolContext) -> dict[str, Any]:
+async def place_order(order_id: str, tool_context: ToolContext) -> dict[str, Any]:
     """Place a food order with the given order_id.
     
     Args:
@@ -283,9 +350,8 @@ def place_order(order_id: str, tool_context: ToolContext) -> dict[str, Any]:
         }
     
     # Simulate delivery time (30-60 minutes from now)
-    delivery_time = datetime.now()
     delivery_minutes = random.randint(30, 60)
-    future_time = delivery_time + timedelta(minutes=delivery_minutes)
+    future_time = datetime.now() + timedelta(minutes=delivery_minutes)
     
     # Format time as 12-hour with AM/PM
     formatted_time = future_time.strftime("%I:%M %p")
@@ -294,49 +360,18 @@ def place_order(order_id: str, tool_context: ToolContext) -> dict[str, Any]:
         'order_id': order_id,
     }
     
-    # Initialize blockchain_result to avoid UnboundLocalError
-    blockchain_result = None
-    
-    # Attempt blockchain interaction - handle both sync and async contexts
+    # Run the blockchain interaction on the dedicated loop, where the shared
+    # Aptos client lives, and await it without blocking the runner's loop
     try:
-        import asyncio
-        import concurrent.futures
-        import threading
-        
-        def run_blockchain_task():
-            """Run blockchain task in a new event loop"""
-            try:
-                # Create a new event loop for this thread
-                new_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(new_loop)
-                try:
-                    return new_loop.run_until_complete(_complete_task_on_blockchain(tool_context))
-                finally:
-                    new_loop.close()
-            except Exception as e:
-                logger.error(f"Error in blockchain task thread: {e}")
-                return {
-                    'status': 'failed',
-                    'error': str(e)
-                }
-        
-        try:
-            # Check if we're in an async context
-            loop = asyncio.get_running_loop()
-            # If we're in an event loop, run in a separate thread
-            logger.info("Running blockchain task in separate thread to avoid blocking event loop")
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_blockchain_task)
-                blockchain_result = future.result(timeout=30)  # 30 second timeout
-                
-        except RuntimeError:
-            # No event loop running, safe to use asyncio.run()
-            logger.info("Running blockchain task in current thread")
-            blockchain_result = asyncio.run(_complete_task_on_blockchain(tool_context))
-            
+        future = asyncio.run_coroutine_threadsafe(
+            _complete_task_on_blockchain(tool_context), get_blockchain_loop()
+        )
+        blockchain_result = await asyncio.wait_for(
+            asyncio.wrap_future(future), timeout=30  # 30 second timeout
+        )
     except Exception as e:
         # Log error but don't fail the order
-        logger.warning(f"Blockchain interaction failed: {e}")
+        logger.warning("Blockchain interaction failed: %s", e)
         blockchain_result = {
             'status': 'failed',
             'error': str(e)
@@ -352,21 +387,37 @@ def place_order(order_id: str, tool_context: ToolContext) -> dict[str, Any]:
     
     # Add tracking URL if blockchain transaction was successful
     if blockchain_result and blockchain_result.get('status') == 'completed' and blockchain_result.get('transaction_hash'):
-        # For Aptos network, use Aptos explorer with dynamic network detection
+        # For Aptos network, use Aptos explorer for the configured network
         tx_hash = blockchain_result['transaction_hash']
-        # Determine network from environment or default to devnet
-        aptos_node_url = os.environ.get('APTOS_NODE_URL', 'https://fullnode.devnet.aptoslabs.com')
-        if 'mainnet' in aptos_node_url:
-            network = 'mainnet'
-        elif 'testnet' in aptos_node_url:
-            network = 'testnet'
-        else:
-            network = 'devnet'
-        order_response['tracking_url'] = f"https://explorer.aptoslabs.com/txn/{tx_hash}?network={network}"
+        order_response['tracking_url'] = f"{_EXPLORER_TXN_URL}{tx_hash}{_EXPLORER_NETWORK_QUERY}"
     
     return order_response
 
 
+async def _get_aptos_task_manager() -> tuple[Optional[AptosTaskManager], str]:
+    """Return the shared AptosTaskManager, creating it on first use.
+    
+    Only called on the blockchain loop. The network connection and account
+    are checked once instead of on every order.
+    
+    Returns:
+        A tuple of (task_manager, error_message).
+    """
+    global _aptos_task_manager
+    if _aptos_task_manager is None:
+        aptos_config = AptosConfig()
+        if not await aptos_config.is_connected():
+            logger.error("Unable to connect to Aptos network")
+            return None, 'Aptos network connection failed'
+            
+        if not aptos_config.account:
+            logger.error("No Aptos private key found in environment")
+            return None, 'Aptos private key not configured'
+            
+        _aptos_task_manager = AptosTaskManager(aptos_config)
+    return _aptos_task_manager, ''
+
+
 async def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[dict[str, Any]]:
     """Complete the task on Aptos blockchain by calling complete_task function.
     
@@ -392,7 +443,7 @@ async def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[di
         task_id = session_id
         
         # Get Host Agent address (task creator) from environment
-        host_agent_address = os.environ.get('HOST_AGENT_APTOS_ADDRESS')
+        host_agent_address = HOST_AGENT_APTOS_ADDRESS
         if not host_agent_address:
             logger.error("No HOST_AGENT_APTOS_ADDRESS found in environment")
             return None
@@ -401,21 +452,14 @@ async def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[di
         if not host_agent_address.startswith('0x'):
             host_agent_address = '0x' + host_agent_address
             
-        # Initialize Aptos configuration and task manager
+        # Get the shared Aptos task manager
         try:
-            aptos_config = AptosConfig()
-            if not await aptos_config.is_connected():
-                logger.error("Unable to connect to Aptos network")
-                return {'status': 'failed', 'error': 'Aptos network connection failed'}
-                
-            if not aptos_config.account:
-                logger.error("No Aptos private key found in environment")
-                return {'status': 'failed', 'error': 'Aptos private key not configured'}
-                
-            aptos_task_manager = AptosTaskManager(aptos_config)
+            aptos_task_manager, error_message = await _get_aptos_task_manager()
         except Exception as e:
-            logger.error(f"Failed to initialize Aptos configuration: {e}")
+            logger.error("Failed to initialize Aptos configuration: %s", e)
             return {'status': 'failed', 'error': f'Aptos initialization failed: {str(e)}'}
+        if aptos_task_manager is None:
+            return {'status': 'failed', 'error': error_message}
         
         # Call complete_task on Aptos blockchain
         result = await aptos_task_manager.complete_task(
@@ -425,8 +469,8 @@ async def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[di
         
         if result.get('success'):
             tx_hash = result.get('tx_hash')
-            logger.info(f"[APTOS NETWORK] Service Agent: complete_task transaction sent: {tx_hash}")
-            logger.info(f"[APTOS NETWORK] Service Agent: Claimed bounty from task completion")
+            logger.info("[APTOS NETWORK] Service Agent: complete_task transaction sent: %s", tx_hash)
+            logger.info("[APTOS NETWORK] Service Agent: Claimed bounty from task completion")
             
             return {
                 'status': 'completed',
@@ -436,53 +480,22 @@ async def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[di
                 'network': 'aptos'
             }
         else:
-            logger.error(f"Blockchain task completion failed: {result.get('error', 'Unknown error')}")
+            logger.error("Blockchain task completion failed: %s", result.get('error', 'Unknown error'))
             return {
                 'status': 'failed',
                 'error': result.get('error', 'Unknown blockchain error')
             }
         
     except Exception as e:
-        logger.error(f"Error completing task on Aptos blockchain: {e}")
+        logger.error("Error completing task on Aptos blockchain: %s", e)
         return {
             'status': 'failed',
             'error': str(e)
         }
 
 
-class FoodOrderingAgent(AgentWithTaskManager):
-    """An agent that handles food ordering services for Bay Area customers."""
-
-    SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
-
-    def __init__(self):
-        global _current_agent_instance
-        self._agent = self._build_agent()
-        self._user_id = 'remote_agent'
-        self._runner = Runner(
-            app_name=self._agent.name,
-            agent=self._agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
-        )
-        # Store current session_id for use in tool functions
-        self._current_session_id = None
-        # Set global reference
-        _current_agent_instance = self
-
-    def get_processing_message(self) -> str:
-        return '正在处理您的订餐请求...'
-
-    def _build_agent(self) -> LlmAgent:
-        """Builds the LLM agent for the food ordering service."""
-        return LlmAgent(
-            model='gemini-2.0-flash-001',
-            name='bay_area_food_ordering_agent_v1',
-            description=(
-                'This agent helps Bay Area users order food delivery or make restaurant reservations.'
-            ),
-            instruction="""
+# Agent instruction prompt, shared by every FoodOrderingAgent instance
+_INSTRUCTION = """
 你是一个专业的订餐助手，专为北美湾区（旧金山、伯克利、奥克兰、帕洛阿尔托等）的用户提供服务。你可以帮助用户查找餐厅、订购外卖和预订餐厅。
 
 当用户询问餐厅推荐时：
@@ -515,7 +528,42 @@ class FoodOrderingAgent(AgentWithTaskManager):
 始终保持友好专业的态度，如果用户提出的餐厅或食物在数据库中找不到，请礼貌地告知并推荐类似的选择。
 
 记住你服务的是湾区用户，所以要熟悉该地区的热门餐厅、当地特色菜和用餐习惯。
-    """,
+    """
+
+
+class FoodOrderingAgent(AgentWithTaskManager):
+    """An agent that handles food ordering services for Bay Area customers."""
+
+    SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
+
+    def __init__(self):
+        global _current_agent_instance
+        self._agent = self._build_agent()
+        self._user_id = 'remote_agent'
+        self._runner = Runner(
+            app_name=self._agent.name,
+            agent=self._agent,
+            artifact_service=InMemoryArtifactService(),
+            session_service=InMemorySessionService(),
+            memory_service=InMemoryMemoryService(),
+        )
+        # Store current session_id for use in tool functions
+        self._current_session_id = None
+        # Set global reference
+        _current_agent_instance = self
+
+    def get_processing_message(self) -> str:
+        return '正在处理您的订餐请求...'
+
+    def _build_agent(self) -> LlmAgent:
+        """Builds the LLM agent for the food ordering service."""
+        return LlmAgent(
+            model='gemini-2.0-flash-001',
+            name='bay_area_food_ordering_agent_v1',
+            description=(
+                'This agent helps Bay Area users order food delivery or make restaurant reservations.'
+            ),
+            instruction=_INSTRUCTION,
             tools=[
                 search_restaurants,
                 create_order_form,
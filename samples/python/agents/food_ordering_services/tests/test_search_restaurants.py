@@ -0,0 +1,72 @@
+import itertools
+import unittest
+
+from agent import RESTAURANTS, search_restaurants
+
+
+def reference_search_restaurants(cuisine=None, location=None, price_range=None):
+    """The original linear-scan filter that the precomputed index replaces."""
+    results = []
+    if cuisine and cuisine.lower() in RESTAURANTS:
+        search_categories = [cuisine.lower()]
+    else:
+        search_categories = RESTAURANTS.keys()
+    for category in search_categories:
+        for restaurant in RESTAURANTS[category]:
+            match = True
+            if location and location.lower() not in restaurant['location'].lower():
+                match = False
+            if price_range and price_range != restaurant['price_range']:
+                match = False
+            if match:
+                results.append(restaurant)
+    results.sort(key=lambda x: x['rating'], reverse=True)
+    return results
+
+
+CUISINES = [None, '', 'pizza', 'Chinese', 'JAPANESE', 'mexican', 'thai', 'unknown']
+LOCATIONS = [
+    None,
+    '',
+    'San Francisco',
+    'san francisco',
+    'SAN',
+    'francisco',
+    'Berkeley',
+    'oak',
+    'ley',
+    'n f',
+    'Palo Alto',
+    'nowhere',
+]
+PRICE_RANGES = [None, '', '$', '$$', '$$$', '$$$$', 'cheap']
+
+
+class SearchRestaurantsTest(unittest.TestCase):
+    """The restaurant index must return what the linear filter returned."""
+
+    def test_matches_reference_filter(self) -> None:
+        """Every filter combination, including case and substring matches."""
+        for args in itertools.product(CUISINES, LOCATIONS, PRICE_RANGES):
+            with self.subTest(args=args):
+                self.assertEqual(
+                    search_restaurants(*args),
+                    reference_search_restaurants(*args),
+                )
+
+    def test_results_sorted_by_rating(self) -> None:
+        """Unfiltered results come back highest rated first."""
+        ratings = [r['rating'] for r in search_restaurants()]
+        self.assertEqual(ratings, sorted(ratings, reverse=True))
+
+    def test_location_match_ignores_case(self) -> None:
+        """Location filtering is a case-insensitive substring match."""
+        self.assertEqual(
+            search_restaurants(location='BERKELEY'),
+            search_restaurants(location='berkeley'),
+        )
+        self.assertTrue(search_restaurants(location='berkeley'))
+
+
+if __name__ == '__main__':
+    unittest.main()
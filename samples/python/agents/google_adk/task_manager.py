@@ -1,14 +1,17 @@
-import json
+import asyncio
 import logging
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import AsyncIterable
 from typing import Any
 
 from common.server import utils
+from common.server.streaming import BufferedStream
 from common.server.task_manager import InMemoryTaskManager
 from common.types import (
     Artifact,
+    DataPart,
     InternalError,
     JSONRPCResponse,
     Message,
@@ -24,16 +27,90 @@ from common.types import (
     TaskStatusUpdateEvent,
     TextPart,
 )
+from common.utils.fast_json import json_loads
 from google.genai import types
 # Import Ethereum related libraries
-from web3 import Web3
-from eth_account import Account
-from eth_account.messages import encode_defunct
+from eth_keys import keys
+from eth_utils import decode_hex, keccak
 
 
 logger = logging.getLogger(__name__)
 
 
+# Maximum number of verified signatures remembered per task manager
+_SIGNATURE_CACHE_SIZE = 4096
+# Maximum number of (address, session_id) message hashes kept per task manager
+_MESSAGE_HASH_CACHE_SIZE = 4096
+
+
+# EIP-191 personal-message prefix, followed by the message length
+_EIP191_PREFIX = b"\x19Ethereum Signed Message:\n"
+
+
+def _eip191_hash(address: str, session_id: str) -> bytes:
+    """Return the EIP-191 personal-message hash of address + session_id."""
+    message = address.encode() + session_id.encode()
+    return keccak(b"%b%d%b" % (_EIP191_PREFIX, len(message), message))
+
+
+def _recover_address(message_hash: bytes, signature: str) -> str:
+    """Recover the lowercase address that signed the 32-byte `message_hash`.
+
+    Runs in a worker thread so the event loop is not held during recovery.
+    eth_keys uses the libsecp256k1 (coincurve) backend when it is installed.
+    """
+    signature_bytes = decode_hex(signature)
+    if len(signature_bytes) != 65:
+        raise ValueError(
+            f"expected a 65 byte signature, got {len(signature_bytes)} bytes"
+        )
+    # Accept both 27/28 and 0/1 recovery ids
+    v = signature_bytes[64]
+    if v >= 27:
+        v -= 27
+    public_key = keys.Signature(
+        signature_bytes[:64] + bytes([v])
+    ).recover_public_key_from_msg_hash(message_hash)
+    # Lowercase hex; skips the extra keccak of EIP-55 checksum casing
+    return public_key.to_address()
+
+
+def _stream_item_update(
+    item: dict[str, Any],
+) -> tuple[TaskState, list, list[Artifact] | None, bool]:
+    """Classify an agent stream item into its task update tuple.
+
+    Progress items carry text in 'updates'; the final item carries either
+    text, a form (a tool response whose 'result' is a JSON string) or other
+    structured data in 'content'.
+    """
+    if not item['is_task_complete']:
+        return (
+            TaskState.WORKING,
+            [TextPart.model_construct(text=item['updates'])],
+            None,
+            False,
+        )
+    content = item['content']
+    if isinstance(content, dict):
+        response = content.get('response')
+        if isinstance(response, dict) and 'result' in response:
+            task_state = TaskState.INPUT_REQUIRED
+            parts = [DataPart.model_construct(data=json_loads(response['result']))]
+        else:
+            task_state = TaskState.COMPLETED
+            parts = [DataPart.model_construct(data=content)]
+    else:
+        task_state = TaskState.COMPLETED
+        parts = [TextPart.model_construct(text=content)]
+    return (
+        task_state,
+        parts,
+        [Artifact.model_construct(parts=parts, index=0, append=False)],
+        True,
+    )
+
+
 # TODO: Move this class (or these classes) to a common directory
 class AgentWithTaskManager(ABC):
     @abstractmethod
@@ -57,18 +134,19 @@ class AgentWithTaskManager(ABC):
                 session_id=session_id,
             )
         
-        # Use async runner to avoid NoneType await expression error
-        events = []
+        # Use async runner to avoid NoneType await expression error; only the
+        # last event is kept
+        last_event = None
         async for event in self._runner.run_async(
             user_id=self._user_id, session_id=session.id, new_message=content
         ):
-            events.append(event)
+            last_event = event
             if event.is_final_response():
                 break
         
-        if not events or not events[-1].content or not events[-1].content.parts:
+        if not last_event or not last_event.content or not last_event.content.parts:
             return ''
-        return '\n'.join([p.text for p in events[-1].content.parts if p.text])
+        return '\n'.join(p.text for p in last_event.content.parts if p.text)
 
     async def stream(self, query, session_id) -> AsyncIterable[dict[str, Any]]:
         session = await self._runner.session_service.get_session(
@@ -90,30 +168,22 @@ class AgentWithTaskManager(ABC):
             user_id=self._user_id, session_id=session.id, new_message=content
         ):
             if event.is_final_response():
-                response = ''
-                if (
-                    event.content
-                    and event.content.parts
-                    and event.content.parts[0].text
-                ):
-                    response = '\n'.join(
-                        [p.text for p in event.content.parts if p.text]
-                    )
-                elif (
-                    event.content
-                    and event.content.parts
-                    and any(
-                        [
-                            True
-                            for p in event.content.parts
-                            if p.function_response
-                        ]
-                    )
-                ):
-                    response = next(
-                        p.function_response.model_dump()
-                        for p in event.content.parts
-                    )
+                # Single pass: collect text parts and the first function
+                # response
+                texts = []
+                function_response = None
+                if event.content and event.content.parts:
+                    for p in event.content.parts:
+                        if p.text:
+                            texts.append(p.text)
+                        elif p.function_response and function_response is None:
+                            function_response = p.function_response
+                if texts:
+                    response = '\n'.join(texts)
+                elif function_response:
+                    response = function_response.model_dump()
+                else:
+                    response = ''
                 yield {
                     'is_task_complete': True,
                     'content': response,
@@ -130,6 +200,27 @@ class AgentTaskManager(InMemoryTaskManager):
         super().__init__()
         self.agent = agent
         self.verify_signatures = verify_signatures
+        # (address, session_id, signature) triples that already verified,
+        # oldest first, so retries and re-subscriptions skip key recovery
+        self._verified_signatures: OrderedDict[tuple[str, str, str], None] = OrderedDict()
+        # EIP-191 hashes of recently seen (address, session_id) pairs
+        self._message_hashes: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        # Compatibility of client-accepted output modes with this agent's
+        # fixed content types, keyed by the accepted modes
+        self._modality_cache: dict[frozenset[str], bool] = {}
+
+    def _get_message_hash(self, address: str, session_id: str) -> bytes:
+        """Return the signed-message hash for the pair, computing it once."""
+        key = (address, session_id)
+        message_hash = self._message_hashes.get(key)
+        if message_hash is None:
+            message_hash = _eip191_hash(address, session_id)
+            self._message_hashes[key] = message_hash
+            if len(self._message_hashes) > _MESSAGE_HASH_CACHE_SIZE:
+                self._message_hashes.popitem(last=False)
+        else:
+            self._message_hashes.move_to_end(key)
+        return message_hash
 
     async def _validate_signature(self, task_send_params: TaskSendParams) -> tuple[bool, str]:
         """Validate the signature from the Host Agent.
@@ -166,23 +257,35 @@ class AgentTaskManager(InMemoryTaskManager):
             if not signature:
                 return False, "Missing signature in auth data"
                 
-            # Reconstruct the original message that was signed
-            message_to_verify = f"{address}{session_id}"
-            message_hash = encode_defunct(text=message_to_verify)
-            
+            # Skip key recovery for signatures that already verified
+            cache_key = (address.lower(), session_id, signature)
+            if cache_key in self._verified_signatures:
+                self._verified_signatures.move_to_end(cache_key)
+                return True, ""
+                
             # Recover the address that signed the message
             try:
-                recovered_address = Account.recover_message(message_hash, signature=signature)
-                
-                # Check if the recovered address matches the claimed address
-                if recovered_address.lower() != address.lower():
-                    return False, f"Signature verification failed. Expected {address}, got {recovered_address}"
-                    
-                logger.info(f"Signature verified successfully for address {address}")
-                return True, ""
+                recovered_address = await asyncio.to_thread(
+                    _recover_address,
+                    self._get_message_hash(address, session_id),
+                    signature,
+                )
             except Exception as e:
                 return False, f"Error recovering address from signature: {e}"
                 
+            # Check if the recovered address matches the claimed address
+            if recovered_address != address.lower():
+                return False, f"Signature verification failed. Expected {address}, got {recovered_address}"
+                
+            # Only successful verifications are cached, so invalid requests
+            # cannot evict them
+            self._verified_signatures[cache_key] = None
+            if len(self._verified_signatures) > _SIGNATURE_CACHE_SIZE:
+                self._verified_signatures.popitem(last=False)
+                
+            logger.info(f"Signature verified successfully for address {address}")
+            return True, ""
+                
         except Exception as e:
             logger.error(f"Error validating signature: {e}")
             return False, f"Error validating signature: {e}"
@@ -192,67 +295,59 @@ class AgentTaskManager(InMemoryTaskManager):
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
+        # The agent keeps producing while earlier updates are written out
+        updates = BufferedStream(
+            (
+                _stream_item_update(item)
+                async for item in self.agent.stream(
+                    query, task_send_params.sessionId
+                )
+            ),
+            # is_task_complete
+            is_last=lambda update: update[3],
+        )
         try:
-            async for item in self.agent.stream(
-                query, task_send_params.sessionId
-            ):
-                is_task_complete = item['is_task_complete']
-                artifacts = None
-                if not is_task_complete:
-                    task_state = TaskState.WORKING
-                    parts = [{'type': 'text', 'text': item['updates']}]
-                else:
-                    if isinstance(item['content'], dict):
-                        if (
-                            'response' in item['content']
-                            and 'result' in item['content']['response']
-                        ):
-                            data = json.loads(
-                                item['content']['response']['result']
-                            )
-                            task_state = TaskState.INPUT_REQUIRED
-                        else:
-                            data = item['content']
-                            task_state = TaskState.COMPLETED
-                        parts = [{'type': 'data', 'data': data}]
-                    else:
-                        task_state = TaskState.COMPLETED
-                        parts = [{'type': 'text', 'text': item['content']}]
-                    artifacts = [Artifact(parts=parts, index=0, append=False)]
-            message = Message(role='agent', parts=parts)
-            task_status = TaskStatus(state=task_state, message=message)
-            await self._update_store(
-                task_send_params.id, task_status, artifacts
-            )
-            task_update_event = TaskStatusUpdateEvent(
-                id=task_send_params.id,
-                status=task_status,
-                final=False,
-            )
-            yield SendTaskStreamingResponse(
-                id=request.id, result=task_update_event
-            )
-            # Now yield Artifacts too
-            if artifacts:
-                for artifact in artifacts:
-                    yield SendTaskStreamingResponse(
+            async for update in updates:
+                task_state, parts, artifacts, is_task_complete = update
+                message = Message.model_construct(role='agent', parts=parts)
+                task_status = TaskStatus.model_construct(
+                    state=task_state, message=message
+                )
+                await self._update_store(
+                    task_send_params.id, task_status, artifacts
+                )
+                task_update_event = TaskStatusUpdateEvent.model_construct(
+                    id=task_send_params.id,
+                    status=task_status,
+                    final=False,
+                )
+                yield SendTaskStreamingResponse.model_construct(
+                    id=request.id, result=task_update_event
+                )
+                # Now yield Artifacts too, letting other connections run
+                # between events
+                if artifacts:
+                    await asyncio.sleep(0)
+                    for artifact in artifacts:
+                        yield SendTaskStreamingResponse.model_construct(
+                            id=request.id,
+                            result=TaskArtifactUpdateEvent.model_construct(
+                                id=task_send_params.id,
+                                artifact=artifact,
+                            ),
+                        )
+                if is_task_complete:
+                    yield SendTaskStreamingResponse.model_construct(
                         id=request.id,
-                        result=TaskArtifactUpdateEvent(
+                        result=TaskStatusUpdateEvent.model_construct(
                             id=task_send_params.id,
-                            artifact=artifact,
+                            status=TaskStatus.model_construct(
+                                state=task_status.state,
+                            ),
+                            final=True,
                         ),
                     )
-            if is_task_complete:
-                yield SendTaskStreamingResponse(
-                    id=request.id,
-                    result=TaskStatusUpdateEvent(
-                        id=task_send_params.id,
-                        status=TaskStatus(
-                            state=task_status.state,
-                        ),
-                        final=True,
-                    ),
-                )
+                    break
         except Exception as e:
             logger.error(f'An error occurred while streaming the response: {e}')
             yield JSONRPCResponse(
@@ -261,15 +356,22 @@ class AgentTaskManager(InMemoryTaskManager):
                     message='An error occurred while streaming the response'
                 ),
             )
+        finally:
+            updates.close()
 
     def _validate_request(
         self, request: SendTaskRequest | SendTaskStreamingRequest
     ) -> None:
         task_send_params: TaskSendParams = request.params
-        if not utils.are_modalities_compatible(
-            task_send_params.acceptedOutputModes,
-            self.agent.SUPPORTED_CONTENT_TYPES,
-        ):
+        key = frozenset(task_send_params.acceptedOutputModes or ())
+        compatible = self._modality_cache.get(key)
+        if compatible is None:
+            compatible = utils.are_modalities_compatible(
+                task_send_params.acceptedOutputModes,
+                self.agent.SUPPORTED_CONTENT_TYPES,
+            )
+            self._modality_cache[key] = compatible
+        if not compatible:
             logger.warning(
                 'Unsupported output mode. Received %s, Support %s',
                 task_send_params.acceptedOutputModes,
@@ -316,20 +418,21 @@ class AgentTaskManager(InMemoryTaskManager):
     async def _update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError:
-                logger.error(f'Task {task_id} not found for updating the task')
-                raise ValueError(f'Task {task_id} not found')
-            task.status = status
-            # if status.message is not None:
-            #    self.task_messages[task_id].append(status.message)
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
-            return task
+        # No await happens between the lookup and the updates, so they are
+        # atomic on the event loop and concurrent streams need not queue on
+        # self.lock
+        task = self.tasks.get(task_id)
+        if task is None:
+            logger.error(f'Task {task_id} not found for updating the task')
+            raise ValueError(f'Task {task_id} not found')
+        task.status = status
+        # if status.message is not None:
+        #    self.task_messages[task_id].append(status.message)
+        if artifacts is not None:
+            if task.artifacts is None:
+                task.artifacts = []
+            task.artifacts.extend(artifacts)
+        return task
 
     async def _invoke(self, request: SendTaskRequest) -> SendTaskResponse:
         task_send_params: TaskSendParams = request.params
@@ -339,7 +442,7 @@ class AgentTaskManager(InMemoryTaskManager):
         except Exception as e:
             logger.error(f'Error invoking agent: {e}')
             raise ValueError(f'Error invoking agent: {e}')
-        parts = [{'type': 'text', 'text': result}]
+        parts = [TextPart.model_construct(text=result)]
         task_state = (
             TaskState.INPUT_REQUIRED
             if 'MISSING_INFO:' in result
@@ -347,12 +450,13 @@ class AgentTaskManager(InMemoryTaskManager):
         )
         task = await self._update_store(
             task_send_params.id,
-            TaskStatus(
-                state=task_state, message=Message(role='agent', parts=parts)
+            TaskStatus.model_construct(
+                state=task_state,
+                message=Message.model_construct(role='agent', parts=parts),
             ),
-            [Artifact(parts=parts)],
+            [Artifact.model_construct(parts=parts)],
         )
-        return SendTaskResponse(id=request.id, result=task)
+        return SendTaskResponse.model_construct(id=request.id, result=task)
 
     def _get_user_query(self, task_send_params: TaskSendParams) -> str:
         part = task_send_params.message.parts[0]
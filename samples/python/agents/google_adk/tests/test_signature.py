@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+
+from common.types import Message, TaskSendParams, TextPart
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from task_manager import AgentTaskManager
+
+
+class _StubAgent:
+    SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
+
+
+def reference_verify(address: str, session_id: str, signature: str) -> bool:
+    """The original eth_account check that eth_keys recovery replaces."""
+    try:
+        message_hash = encode_defunct(text=f'{address}{session_id}')
+        recovered = Account.recover_message(message_hash, signature=signature)
+    except Exception:
+        return False
+    return recovered.lower() == address.lower()
+
+
+def make_params(session_id: str, auth: dict | None) -> TaskSendParams:
+    metadata = {'auth': auth} if auth is not None else None
+    return TaskSendParams(
+        id='task-1',
+        sessionId=session_id,
+        message=Message(
+            role='user', parts=[TextPart(text='hi')], metadata=metadata
+        ),
+    )
+
+
+def sign(account, address: str, session_id: str) -> str:
+    message = encode_defunct(text=f'{address}{session_id}')
+    return account.sign_message(message).signature.hex()
+
+
+def with_recovery_id(signature: str, v: int) -> str:
+    """Return signature with its final recovery byte replaced by v."""
+    raw = bytes.fromhex(signature.removeprefix('0x'))
+    return '0x' + (raw[:64] + bytes([v])).hex()
+
+
+class ValidateSignatureTest(unittest.TestCase):
+    """eth_keys recovery must accept and reject what eth_account did."""
+
+    SESSION_ID = 'session-123'
+
+    def setUp(self) -> None:
+        self.signer = Account.create()
+        self.other = Account.create()
+
+    def validate(self, params: TaskSendParams) -> tuple[bool, str]:
+        # A fresh manager per call so the verified-signature cache never
+        # masks a recovery result
+        manager = AgentTaskManager(agent=_StubAgent(), verify_signatures=True)
+        return asyncio.run(manager._validate_signature(params))
+
+    def assert_matches_reference(self, address: str, session_id: str, signature: str) -> None:
+        is_valid, _ = self.validate(
+            make_params(session_id, {'address': address, 'signature': signature})
+        )
+        self.assertEqual(is_valid, reference_verify(address, session_id, signature))
+
+    def test_signature_cases_match_reference(self) -> None:
+        """Valid, mismatched and malformed signatures are judged the same."""
+        address = self.signer.address
+        valid = sign(self.signer, address, self.SESSION_ID)
+        raw_v = int(valid[-2:], 16)
+        cases = {
+            'valid': (address, self.SESSION_ID, valid),
+            'valid without 0x': (address, self.SESSION_ID, valid.removeprefix('0x')),
+            'lowercase address signed': (
+                address.lower(),
+                self.SESSION_ID,
+                sign(self.signer, address.lower(), self.SESSION_ID),
+            ),
+            'checksum address, lowercase signed': (
+                address,
+                self.SESSION_ID,
+                sign(self.signer, address.lower(), self.SESSION_ID),
+            ),
+            'wrong signer': (
+                address,
+                self.SESSION_ID,
+                sign(self.other, address, self.SESSION_ID),
+            ),
+            'different session': (
+                address,
+                'other-session',
+                valid,
+            ),
+            'recovery id 0/1': (
+                address,
+                self.SESSION_ID,
+                with_recovery_id(valid, raw_v - 27),
+            ),
+            'flipped recovery id': (
+                address,
+                self.SESSION_ID,
+                with_recovery_id(valid, 55 - raw_v),
+            ),
+            'truncated': (address, self.SESSION_ID, valid[:-2]),
+            'extended': (address, self.SESSION_ID, valid + '00'),
+            'not hex': (address, self.SESSION_ID, '0x' + 'zz' * 65),
+            'zeros': (address, self.SESSION_ID, '0x' + '00' * 65),
+        }
+        for name, (case_address, session_id, signature) in cases.items():
+            with self.subTest(name):
+                self.assert_matches_reference(case_address, session_id, signature)
+
+    def test_valid_signature_accepted(self) -> None:
+        address = self.signer.address
+        signature = sign(self.signer, address, self.SESSION_ID)
+        self.assertEqual(
+            self.validate(
+                make_params(
+                    self.SESSION_ID, {'address': address, 'signature': signature}
+                )
+            ),
+            (True, ''),
+        )
+
+    def test_missing_auth_rejected(self) -> None:
+        """Requests without auth data, an address or a signature fail."""
+        signature = sign(self.signer, self.signer.address, self.SESSION_ID)
+        cases = {
+            'no metadata': None,
+            'no address': {'signature': signature},
+            'no signature': {'address': self.signer.address},
+            'empty signature': {'address': self.signer.address, 'signature': ''},
+        }
+        for name, auth in cases.items():
+            with self.subTest(name):
+                is_valid, error = self.validate(make_params(self.SESSION_ID, auth))
+                self.assertFalse(is_valid)
+                self.assertTrue(error)
+
+    def test_verification_disabled_accepts_anything(self) -> None:
+        manager = AgentTaskManager(agent=_StubAgent(), verify_signatures=False)
+        self.assertEqual(
+            asyncio.run(manager._validate_signature(make_params(self.SESSION_ID, None))),
+            (True, ''),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,14 @@
-import json
+import asyncio
+import copy
 import logging
 import random
 import os
-import uuid
-from datetime import datetime, timedelta
-from typing import Any, Optional, List, Dict
+import functools
+import itertools
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, ClassVar, Optional, List, Dict, Iterable, Tuple
 
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.artifacts import InMemoryArtifactService
@@ -13,20 +17,45 @@ from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.tools.tool_context import ToolContext
 from task_manager import AgentWithTaskManager
-# Import Aptos related libraries
-from common.aptos_config import AptosConfig
-from common.aptos_blockchain import AptosTaskManager
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from common.utils.blockchain_loop import get_blockchain_loop
+from common.utils.fast_json import json_loads
+
+
+if TYPE_CHECKING:
+    from common.aptos_blockchain import AptosTaskManager
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+
 # Global reference to the current agent instance for tool functions
 _current_agent_instance = None
 
-# Local cache of created booking_ids for demo purposes
-booking_ids = set()
+# Local cache of created booking_ids for demo purposes, oldest first; capped
+# so it cannot grow without bound
+_MAX_BOOKING_IDS = 10_000
+booking_ids: OrderedDict[str, None] = OrderedDict()
+
+# Per-process id sequences, seeded from the start time in milliseconds so ids
+# stay unique within the process and rarely repeat across restarts
+_hotel_counter = itertools.count(int(time.time() * 1000))
+_flight_counter = itertools.count(int(time.time() * 1000))
+_itinerary_counter = itertools.count(int(time.time() * 1000))
+
+# Default upper bound on complete_task submissions in flight against the
+# Aptos node; APTOS_MAX_CONCURRENT_TASKS overrides it
+_DEFAULT_BLOCKCHAIN_CONCURRENCY = 8
+# Enforces that bound on the blockchain loop; created on first use
+_blockchain_semaphore: Optional[asyncio.Semaphore] = None
+
+# complete_task submissions in flight on the blockchain loop, keyed by
+# (host agent address, session id); bookings that complete the same task
+# concurrently share one transaction
+_pending_completions: Dict[tuple, asyncio.Task] = {}
+
+# AptosTaskManager shared by all submissions on the blockchain loop, so its
+# RestClient keeps pooled (keep-alive) connections to the Aptos node
+_aptos_task_manager: Optional['AptosTaskManager'] = None
 
 # Global destinations database with worldwide coverage
 DESTINATIONS = {
@@ -142,6 +171,177 @@ ATTRACTIONS = {
     "food": ["Local Restaurants", "Street Food", "Food Markets", "Cooking Classes"]
 }
 
+def _remember_booking_id(booking_id: str) -> None:
+    """Record booking_id, evicting the oldest id when full."""
+    booking_ids[booking_id] = None
+    if len(booking_ids) > _MAX_BOOKING_IDS:
+        booking_ids.popitem(last=False)
+
+
+# Last formatted "created_at" timestamp, as (epoch second, text)
+_timestamp_cache = (0, "")
+
+
+def _now_str() -> str:
+    """Return the current local time as "%Y-%m-%d %H:%M:%S", formatting once per second.
+    
+    Concurrent callers may both format the same second; the result is the same.
+    """
+    global _timestamp_cache
+    now = int(time.time())
+    cached_second, text = _timestamp_cache
+    if now != cached_second:
+        text = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        _timestamp_cache = (now, text)
+    return text
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_date(value: str) -> date:
+    """Parse a YYYY-MM-DD date string.
+    
+    date.fromisoformat handles the usual zero-padded form in C; strptime is
+    only the fallback for forms like "2025-1-5".
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+# Sort rank of each budget level; unknown levels sort with "$$$"
+_BUDGET_ORDER = {"$": 1, "$$": 2, "$$$": 3, "$$$$": 4, "$$$$$": 5}
+
+
+def _index_rows(row_keys: Iterable[Iterable[str]]) -> Dict[str, frozenset]:
+    """Map each key to the indices of the rows listing it among their keys."""
+    index = {}
+    for i, keys in enumerate(row_keys):
+        for key in keys:
+            index.setdefault(key, set()).add(i)
+    return {key: frozenset(rows) for key, rows in index.items()}
+
+
+def _substring_rows(index: Dict[str, frozenset], needle: str) -> frozenset:
+    """Rows with an indexed (lowercased) key containing `needle`."""
+    return frozenset().union(
+        *(rows for key, rows in index.items() if needle in key)
+    )
+
+
+# Destinations as (region, destination) rows, pre-sorted the way
+# search_destinations returns them: lower budget first, then by name
+_DEST_ROWS = tuple(sorted(
+    (
+        (region, destination)
+        for region, destinations in DESTINATIONS.items()
+        for destination in destinations
+    ),
+    key=lambda row: (_BUDGET_ORDER.get(row[1]["budget"], 3), row[1]["name"]),
+))
+_DEST_BY_REGION = _index_rows((region,) for region, _ in _DEST_ROWS)
+_DEST_BY_BUDGET = _index_rows((d["budget"],) for _, d in _DEST_ROWS)
+_DEST_BY_SEASON = _index_rows((d["season"].lower(),) for _, d in _DEST_ROWS)
+_DEST_BY_TYPE = _index_rows((d["type"].lower(),) for _, d in _DEST_ROWS)
+
+# Hotels as (category, hotel) rows in HOTELS order
+_HOTEL_ROWS = tuple(
+    (category, hotel) for category, hotels in HOTELS.items() for hotel in hotels
+)
+_HOTEL_BY_CATEGORY = _index_rows((category,) for category, _ in _HOTEL_ROWS)
+_HOTEL_BY_PRICE = _index_rows((h["price_range"],) for _, h in _HOTEL_ROWS)
+_HOTEL_BY_LOCATION = _index_rows((h["location"].lower(),) for _, h in _HOTEL_ROWS)
+_HOTEL_BY_AMENITIES = _index_rows(
+    (" ".join(h["amenities"]).lower(),) for _, h in _HOTEL_ROWS
+)
+# Global chains match any city
+_HOTEL_GLOBAL = _HOTEL_BY_LOCATION.get("global", frozenset())
+
+# Airlines as (category, airline) rows in AIRLINES order
+_AIRLINE_ROWS = tuple(
+    (category, airline)
+    for category, airlines in AIRLINES.items()
+    for airline in airlines
+)
+_AIRLINE_BY_CATEGORY = _index_rows((category,) for category, _ in _AIRLINE_ROWS)
+_AIRLINE_BY_CLASS = _index_rows(
+    [option.lower() for option in a["class_options"]] for _, a in _AIRLINE_ROWS
+)
+
+# (lowercased name, destination) pairs in DESTINATIONS order, for resolving
+# a destination the user named
+_DEST_NAMES = tuple(
+    (destination["name"].lower(), destination)
+    for destinations in DESTINATIONS.values()
+    for destination in destinations
+)
+# Full lowercased names mapped to the record _find_destination resolves
+_DEST_BY_NAME_LOWER = {
+    name: next(d for other, d in _DEST_NAMES if name in other)
+    for name, _ in _DEST_NAMES
+}
+
+# Month of travel (1-12) to its SEASONAL_INFO key
+_MONTH_TO_SEASON = {
+    month: season
+    for season, info in SEASONAL_INFO.items()
+    for month in info["months"]
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _match_destination_name(needle: str) -> Optional[Dict[str, Any]]:
+    """Return the first destination whose lowercased name contains `needle`."""
+    return next((d for name, d in _DEST_NAMES if needle in name), None)
+
+
+def _find_destination(destination: str) -> Optional[Dict[str, Any]]:
+    """Return the first destination whose name contains `destination`, ignoring case."""
+    needle = destination.lower()
+    destination_info = _DEST_BY_NAME_LOWER.get(needle)
+    if destination_info is None:
+        # Partial name: fall back to a substring scan, once per distinct text
+        destination_info = _match_destination_name(needle)
+    return destination_info
+
+
+# Size of the per-search result caches; the tables are constant, so cached
+# matches never go stale
+_SEARCH_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=_SEARCH_CACHE_SIZE)
+def _destination_matches(
+    region: Optional[str],
+    budget: Optional[str],
+    season: Optional[str],
+    travel_type: Optional[str],
+) -> tuple:
+    """Indices into _DEST_ROWS matching the normalized filters, top 15 first."""
+    filters = []
+    
+    # If region is specified, search only that region
+    if region:
+        filters.append(_DEST_BY_REGION[region])
+    
+    # Filter by budget if provided
+    if budget:
+        filters.append(_DEST_BY_BUDGET.get(budget, frozenset()))
+        
+    # Filter by season if provided
+    if season:
+        filters.append(_substring_rows(_DEST_BY_SEASON, season))
+        
+    # Filter by type if provided
+    if travel_type:
+        filters.append(_substring_rows(_DEST_BY_TYPE, travel_type))
+    
+    if not filters:
+        return tuple(range(min(len(_DEST_ROWS), 15)))
+    # Rows are already in budget/name order; keep the top 15 results
+    return tuple(sorted(frozenset.intersection(*filters))[:15])
+
+
 def search_destinations(
     region: Optional[str] = None,
     budget: Optional[str] = None,
@@ -159,41 +359,78 @@ def search_destinations(
     Returns:
         List[Dict[str, Any]]: List of matching destinations
     """
-    results = []
+    # Unknown regions search all regions
+    region = region.lower() if region else None
+    if region not in _DEST_BY_REGION:
+        region = None
+    matches = _destination_matches(
+        region,
+        budget or None,
+        season.lower() if season else None,
+        travel_type.lower() if travel_type else None,
+    )
     
-    # If region is specified, search only that region
-    if region and region.lower() in DESTINATIONS:
-        search_regions = [region.lower()]
-    else:
-        # Search all regions
-        search_regions = DESTINATIONS.keys()
+    # Add region info to result
+    return [
+        {**_DEST_ROWS[i][1], "region": _DEST_ROWS[i][0]} for i in matches
+    ]
+
+
+def search_destinations_batch(
+    queries: List[Dict[str, Any]]
+) -> List[List[Dict[str, Any]]]:
+    """Run several destination searches in one call.
     
-    for region_name in search_regions:
-        for destination in DESTINATIONS[region_name]:
-            match = True
-            
-            # Filter by budget if provided
-            if budget and budget != destination["budget"]:
-                match = False
-                
-            # Filter by season if provided
-            if season and season.lower() not in destination["season"].lower():
-                match = False
-                
-            # Filter by type if provided
-            if travel_type and travel_type.lower() not in destination["type"].lower():
-                match = False
-                
-            if match:
-                # Add region info to result
-                result_destination = destination.copy()
-                result_destination["region"] = region_name
-                results.append(result_destination)
+    Args:
+        queries (List[Dict[str, Any]]): One dict per search, each with optional
+            region, budget, season and travel_type keys as in search_destinations
+        
+    Returns:
+        List[List[Dict[str, Any]]]: The matching destinations for each query, in order
+    """
+    return [
+        search_destinations(
+            region=query.get("region"),
+            budget=query.get("budget"),
+            season=query.get("season"),
+            travel_type=query.get("travel_type"),
+        )
+        for query in queries
+    ]
+
+
+@functools.lru_cache(maxsize=_SEARCH_CACHE_SIZE)
+def _hotel_matches(
+    category: Optional[str],
+    city: Optional[str],
+    budget: Optional[str],
+    amenity_keywords: Optional[frozenset],
+) -> tuple:
+    """Indices into _HOTEL_ROWS matching the normalized filters, in order."""
+    filters = []
+    
+    # If hotel_type is specified, search only that category
+    if category:
+        filters.append(_HOTEL_BY_CATEGORY[category])
+    
+    # Filter by location if provided
+    if city:
+        filters.append(_substring_rows(_HOTEL_BY_LOCATION, city) | _HOTEL_GLOBAL)
+        
+    # Filter by budget if provided
+    if budget:
+        filters.append(_HOTEL_BY_PRICE.get(budget, frozenset()))
+        
+    # Filter by amenities if provided; any keyword may match
+    if amenity_keywords is not None:
+        filters.append(frozenset().union(*(
+            _substring_rows(_HOTEL_BY_AMENITIES, keyword)
+            for keyword in amenity_keywords
+        )))
     
-    # Sort by budget (lower cost first) then by name
-    budget_order = {"$": 1, "$$": 2, "$$$": 3, "$$$$": 4, "$$$$$": 5}
-    results.sort(key=lambda x: (budget_order.get(x["budget"], 3), x["name"]))
-    return results[:15]  # Limit to top 15 results
+    if not filters:
+        return tuple(range(len(_HOTEL_ROWS)))
+    return tuple(sorted(frozenset.intersection(*filters)))
 
 
 def search_hotels(
@@ -213,41 +450,41 @@ def search_hotels(
     Returns:
         List[Dict[str, Any]]: List of matching hotels
     """
-    results = []
+    # Unknown hotel types search all categories
+    category = hotel_type.lower() if hotel_type else None
+    if category not in _HOTEL_BY_CATEGORY:
+        category = None
+    matches = _hotel_matches(
+        category,
+        city.lower() if city else None,
+        budget or None,
+        frozenset(amenities.lower().split()) if amenities else None,
+    )
     
-    # If hotel_type is specified, search only that category
-    if hotel_type and hotel_type.lower() in HOTELS:
-        search_categories = [hotel_type.lower()]
-    else:
-        # Search all categories
-        search_categories = HOTELS.keys()
+    # Add category info to result
+    return [
+        {**_HOTEL_ROWS[i][1], "category": _HOTEL_ROWS[i][0]} for i in matches
+    ]
+
+
+@functools.lru_cache(maxsize=_SEARCH_CACHE_SIZE)
+def _airline_matches(
+    airline_type: Optional[str], travel_class: Optional[str]
+) -> tuple:
+    """Indices into _AIRLINE_ROWS matching the normalized filters, in order."""
+    filters = []
     
-    for category in search_categories:
-        for hotel in HOTELS[category]:
-            match = True
-            
-            # Filter by location if provided
-            if city and city.lower() not in hotel["location"].lower() and hotel["location"] != "Global":
-                match = False
-                
-            # Filter by budget if provided
-            if budget and budget != hotel["price_range"]:
-                match = False
-                
-            # Filter by amenities if provided
-            if amenities:
-                amenity_keywords = amenities.lower().split()
-                hotel_amenities = " ".join(hotel["amenities"]).lower()
-                if not any(keyword in hotel_amenities for keyword in amenity_keywords):
-                    match = False
-                    
-            if match:
-                # Add category info to result
-                result_hotel = hotel.copy()
-                result_hotel["category"] = category
-                results.append(result_hotel)
+    # If airline_type is specified, search only that category
+    if airline_type:
+        filters.append(_AIRLINE_BY_CATEGORY[airline_type])
+    
+    # Filter by travel class if provided
+    if travel_class:
+        filters.append(_substring_rows(_AIRLINE_BY_CLASS, travel_class))
     
-    return results
+    if not filters:
+        return tuple(range(len(_AIRLINE_ROWS)))
+    return tuple(sorted(frozenset.intersection(*filters)))
 
 
 def search_flights(
@@ -269,48 +506,29 @@ def search_flights(
     Returns:
         List[Dict[str, Any]]: List of matching airlines and flight options
     """
-    results = []
+    # Basic route matching (simplified for demo): assume all airlines can
+    # serve major routes. In real implementation, this would check actual
+    # route networks
+    matches = _airline_matches(
+        airline_type if airline_type in _AIRLINE_BY_CATEGORY else None,
+        travel_class.lower() if travel_class else None,
+    )
     
-    # If airline_type is specified, search only that category
-    if airline_type and airline_type in AIRLINES:
-        search_categories = [airline_type]
-    else:
-        # Search all categories
-        search_categories = AIRLINES.keys()
-    
-    for category in search_categories:
-        for airline in AIRLINES[category]:
-            match = True
-            
-            # Filter by travel class if provided
-            if travel_class:
-                class_available = any(travel_class.lower() in class_option.lower() 
-                                    for class_option in airline["class_options"])
-                if not class_available:
-                    match = False
-            
-            # Basic route matching (simplified for demo)
-            if origin or destination:
-                # For demo purposes, assume all airlines can serve major routes
-                # In real implementation, this would check actual route networks
-                pass
-                    
-            if match:
-                # Add category info to result
-                result_airline = airline.copy()
-                result_airline["category"] = category
-                
-                # Add estimated flight info for demo
-                if origin and destination:
-                    result_airline["route"] = f"{origin} -> {destination}"
-                    if departure_date:
-                        result_airline["departure_date"] = departure_date
-                    result_airline["estimated_duration"] = "8-15 hours (varies by route)"
-                    result_airline["price_estimate"] = "$500-$3000 (varies by class and route)"
-                
-                results.append(result_airline)
+    # Add estimated flight info for demo; the same for every airline, so
+    # built once per call
+    flight_info = {}
+    if origin and destination:
+        flight_info["route"] = f"{origin} -> {destination}"
+        if departure_date:
+            flight_info["departure_date"] = departure_date
+        flight_info["estimated_duration"] = "8-15 hours (varies by route)"
+        flight_info["price_estimate"] = "$500-$3000 (varies by class and route)"
     
-    return results
+    # Add category info to result
+    return [
+        {**_AIRLINE_ROWS[i][1], "category": _AIRLINE_ROWS[i][0], **flight_info}
+        for i in matches
+    ]
 
 
 def get_weather_info(
@@ -333,22 +551,10 @@ def get_weather_info(
         }
     
     # Determine season based on travel month
-    current_season = "year-round"
-    if travel_month:
-        for season, info in SEASONAL_INFO.items():
-            if travel_month in info["months"]:
-                current_season = season
-                break
+    current_season = _MONTH_TO_SEASON.get(travel_month, "year-round")
     
     # Find destination in database for specific recommendations
-    destination_info = None
-    for region in DESTINATIONS.values():
-        for dest in region:
-            if destination.lower() in dest["name"].lower():
-                destination_info = dest
-                break
-        if destination_info:
-            break
+    destination_info = _find_destination(destination)
     
     weather_info = {
         "destination": destination,
@@ -394,14 +600,8 @@ def get_local_attractions(
         }
     
     # Find destination-specific highlights
-    destination_highlights = []
-    for region in DESTINATIONS.values():
-        for dest in region:
-            if destination.lower() in dest["name"].lower():
-                destination_highlights = dest["highlights"]
-                break
-        if destination_highlights:
-            break
+    destination_info = _find_destination(destination)
+    destination_highlights = destination_info["highlights"] if destination_info else []
     
     attractions_info = {
         "destination": destination,
@@ -429,7 +629,7 @@ def get_local_attractions(
     
     return attractions_info
 
-def book_hotel(
+async def book_hotel(
     hotel_name: str,
     city: str,
     checkin_date: str,
@@ -456,11 +656,10 @@ def book_hotel(
     """
     try:
         # Generate booking ID
-        booking_id = 'HTL_' + str(random.randint(1000000, 9999999))
-        booking_ids.add(booking_id)
+        booking_id = f'HTL_{next(_hotel_counter):x}'
+        _remember_booking_id(booking_id)
         
         # Calculate estimated cost (demo purposes)
-        import random
         base_cost = random.randint(150, 800)  # $150-800 per night
         nights = 1  # Simplified calculation
         total_cost = base_cost * nights
@@ -480,11 +679,11 @@ def book_hotel(
             "estimated_cost": f"${total_cost}",
             "currency": "USD",
             "confirmation_number": f"CONF-{booking_id}",
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "created_at": _now_str()
         }
         
         # Complete task on blockchain
-        blockchain_result = _complete_task_on_blockchain(tool_context)
+        blockchain_result = await _complete_task_on_blockchain(tool_context)
         if blockchain_result:
             booking_response['blockchain_completion'] = blockchain_result
             logger.info(f"[APTOS NETWORK] Hotel booking {booking_id} completed on blockchain")
@@ -500,7 +699,7 @@ def book_hotel(
         }
 
 
-def book_flight(
+async def book_flight(
     origin: str,
     destination: str,
     departure_date: str,
@@ -527,14 +726,13 @@ def book_flight(
     """
     try:
         # Generate booking ID
-        booking_id = 'FLT_' + str(random.randint(1000000, 9999999))
-        booking_ids.add(booking_id)
+        booking_id = f'FLT_{next(_flight_counter):x}'
+        _remember_booking_id(booking_id)
         
         # Select airline (demo purposes)
         selected_airline = airline_preference or "United Airlines"
         
         # Calculate estimated cost (demo purposes)
-        import random
         base_cost = random.randint(400, 3000)  # $400-3000 depending on route and class
         passenger_count = int(passengers) if passengers.isdigit() else 1
         total_cost = base_cost * passenger_count
@@ -562,11 +760,11 @@ def book_flight(
                 "outbound": f"{origin} -> {destination} on {departure_date}",
                 "return": f"{destination} -> {origin} on {return_date}" if return_date else None
             },
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "created_at": _now_str()
         }
         
         # Complete task on blockchain
-        blockchain_result = _complete_task_on_blockchain(tool_context)
+        blockchain_result = await _complete_task_on_blockchain(tool_context)
         if blockchain_result:
             booking_response['blockchain_completion'] = blockchain_result
             logger.info(f"[APTOS NETWORK] Flight booking {booking_id} completed on blockchain")
@@ -582,7 +780,29 @@ def book_flight(
         }
 
 
-def create_comprehensive_itinerary(
+# Placeholder activities for each day of a generated itinerary
+_MORNING_ACTIVITY = "Breakfast and local sightseeing"
+_AFTERNOON_ACTIVITY = "Main attraction visit or activity"
+_EVENING_ACTIVITY = "Dinner and local culture experience"
+
+# Services listed on every itinerary; a tuple so responses can share it
+_INCLUDED_SERVICES = (
+    "Accommodation recommendations",
+    "Transportation guidance",
+    "Activity suggestions",
+    "Restaurant recommendations",
+    "Local tips and cultural insights",
+)
+
+# Longest trip create_comprehensive_itinerary accepts
+_MAX_ITINERARY_DAYS = 365
+
+# Estimated itinerary cost range (USD) for each budget level
+_ITINERARY_COST_RANGES = {"$": (500, 1000), "$$": (1000, 2500), "$$$": (2500, 5000),
+                          "$$$$": (5000, 8000), "$$$$$": (8000, 15000)}
+
+
+async def create_comprehensive_itinerary(
     destination: str,
     start_date: str,
     end_date: str,
@@ -608,42 +828,50 @@ def create_comprehensive_itinerary(
         Dict[str, Any]: Comprehensive itinerary with blockchain completion
     """
     try:
-        # Generate itinerary ID
-        itinerary_id = 'ITN_' + str(random.randint(1000000, 9999999))
-        
         # Calculate trip duration
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+        start = _parse_date(start_date)
+        end = _parse_date(end_date)
         duration = (end - start).days
         
+        # Reject unusable requests before building the itinerary or
+        # completing anything on the blockchain
+        if not destination:
+            error = "destination is required"
+        elif not 0 < duration <= _MAX_ITINERARY_DAYS:
+            error = f"trip must last 1-{_MAX_ITINERARY_DAYS} days, got {duration}"
+        else:
+            error = None
+        if error:
+            return {
+                "error": f"Itinerary creation failed: {error}",
+                "itinerary_id": None,
+                "status": "failed"
+            }
+        
+        # Generate itinerary ID
+        itinerary_id = f'ITN_{next(_itinerary_counter):x}'
+        
         # Find destination info
-        destination_info = None
-        for region in DESTINATIONS.values():
-            for dest in region:
-                if destination.lower() in dest["name"].lower():
-                    destination_info = dest
-                    break
-            if destination_info:
-                break
+        destination_info = _find_destination(destination)
         
         # Create day-by-day itinerary (simplified)
-        daily_activities = []
-        for day_num in range(1, min(duration + 1, 8)):  # Limit to 7 days for demo
-            day_activities = {
+        # Day dates come from ordinals and isoformat (YYYY-MM-DD), skipping
+        # timedelta arithmetic and strftime for each day
+        first_day = start.toordinal() - 1
+        daily_activities = [
+            {
                 f"day_{day_num}": {
-                    "date": (start + timedelta(days=day_num-1)).strftime("%Y-%m-%d"),
-                    "morning": "Breakfast and local sightseeing",
-                    "afternoon": "Main attraction visit or activity",
-                    "evening": "Dinner and local culture experience"
+                    "date": date.fromordinal(first_day + day_num).isoformat(),
+                    "morning": _MORNING_ACTIVITY,
+                    "afternoon": _AFTERNOON_ACTIVITY,
+                    "evening": _EVENING_ACTIVITY,
                 }
             }
-            daily_activities.append(day_activities)
+            for day_num in range(1, min(duration + 1, 8))  # Limit to 7 days for demo
+        ]
         
         # Estimate total cost
-        import random
-        budget_ranges = {"$": (500, 1000), "$$": (1000, 2500), "$$$": (2500, 5000), 
-                        "$$$$": (5000, 8000), "$$$$$": (8000, 15000)}
-        cost_range = budget_ranges.get(budget, (1000, 3000))
+        cost_range = _ITINERARY_COST_RANGES.get(budget, (1000, 3000))
         estimated_cost = random.randint(cost_range[0], cost_range[1])
         
         # Create comprehensive itinerary response
@@ -662,14 +890,8 @@ def create_comprehensive_itinerary(
             "estimated_total_cost": f"${estimated_cost}",
             "currency": "USD",
             "daily_activities": daily_activities,
-            "included_services": [
-                "Accommodation recommendations",
-                "Transportation guidance", 
-                "Activity suggestions",
-                "Restaurant recommendations",
-                "Local tips and cultural insights"
-            ],
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "included_services": _INCLUDED_SERVICES,
+            "created_at": _now_str()
         }
         
         # Add destination-specific information if found
@@ -679,7 +901,7 @@ def create_comprehensive_itinerary(
             itinerary_response["destination_type"] = destination_info["type"]
         
         # Complete task on blockchain
-        blockchain_result = _complete_task_on_blockchain(tool_context)
+        blockchain_result = await _complete_task_on_blockchain(tool_context)
         if blockchain_result:
             itinerary_response['blockchain_completion'] = blockchain_result
             logger.info(f"[APTOS NETWORK] Comprehensive itinerary {itinerary_id} completed on blockchain")
@@ -717,21 +939,19 @@ def create_hotel_booking_form(
     Returns:
         Dict[str, Any]: A dictionary containing the hotel booking form data
     """
-    booking_id = 'HTL_FORM_' + str(random.randint(1000000, 9999999))
+    booking_id = f'HTL_FORM_{next(_hotel_counter):x}'
     
     # Set default check-in date to tomorrow if not provided
+    checkin = None
     if not checkin_date:
-        tomorrow = datetime.now() + timedelta(days=1)
-        checkin_date = tomorrow.strftime("%Y-%m-%d")
+        checkin = datetime.now() + timedelta(days=1)
+        checkin_date = checkin.strftime("%Y-%m-%d")
     
     # Set default check-out date to day after check-in if not provided
     if not checkout_date:
-        if checkin_date:
-            checkin = datetime.strptime(checkin_date, "%Y-%m-%d")
-            checkout = checkin + timedelta(days=1)
-            checkout_date = checkout.strftime("%Y-%m-%d")
-        else:
-            checkout_date = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
+        if checkin is None:
+            checkin = _parse_date(checkin_date)
+        checkout_date = (checkin + timedelta(days=1)).strftime("%Y-%m-%d")
     
     return {
         'form_id': booking_id,
@@ -743,7 +963,7 @@ def create_hotel_booking_form(
         'guests': guests or '1',
         'room_type': room_type or 'Standard Room',
         'special_requests': special_requests or 'None',
-        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        'created_at': _now_str()
     }
 
 
@@ -770,7 +990,7 @@ def create_flight_booking_form(
     Returns:
         Dict[str, Any]: A dictionary containing the flight booking form data
     """
-    booking_id = 'FLT_FORM_' + str(random.randint(1000000, 9999999))
+    booking_id = f'FLT_FORM_{next(_flight_counter):x}'
     
     # Set default departure date to next week if not provided
     if not departure_date:
@@ -788,7 +1008,7 @@ def create_flight_booking_form(
         'travel_class': travel_class or 'Economy',
         'airline_preference': airline_preference or 'No preference',
         'trip_type': 'round-trip' if return_date else 'one-way',
-        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        'created_at': _now_str()
     }
 
 
@@ -815,20 +1035,18 @@ def create_itinerary_form(
     Returns:
         Dict[str, Any]: A dictionary containing the itinerary form data
     """
-    form_id = 'ITN_FORM_' + str(random.randint(1000000, 9999999))
+    form_id = f'ITN_FORM_{next(_itinerary_counter):x}'
     
     # Set default dates if not provided (next month for 7 days)
+    start = None
     if not start_date:
-        next_month = datetime.now() + timedelta(days=30)
-        start_date = next_month.strftime("%Y-%m-%d")
+        start = datetime.now() + timedelta(days=30)
+        start_date = start.strftime("%Y-%m-%d")
     
     if not end_date:
-        if start_date:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = start + timedelta(days=7)  # Default 7-day trip
-            end_date = end.strftime("%Y-%m-%d")
-        else:
-            end_date = (datetime.now() + timedelta(days=37)).strftime("%Y-%m-%d")
+        if start is None:
+            start = _parse_date(start_date)
+        end_date = (start + timedelta(days=7)).strftime("%Y-%m-%d")  # Default 7-day trip
     
     return {
         'form_id': form_id,
@@ -840,10 +1058,189 @@ def create_itinerary_form(
         'travel_style': travel_style or 'balanced',
         'interests': interests or 'general sightseeing',
         'special_requirements': special_requirements or 'None',
-        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        'created_at': _now_str()
     }
 
 
+# JSON schemas (and date widgets) of the travel forms, shared by every
+# return_booking_form call
+_HOTEL_FORM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'hotel_name': {
+            'type': 'string',
+            'description': 'Hotel name',
+            'title': 'Hotel Name',
+        },
+        'city': {
+            'type': 'string',
+            'description': 'City where the hotel is located',
+            'title': 'City',
+        },
+        'checkin_date': {
+            'type': 'string',
+            'description': 'Check-in date (YYYY-MM-DD)',
+            'title': 'Check-in Date',
+        },
+        'checkout_date': {
+            'type': 'string',
+            'description': 'Check-out date (YYYY-MM-DD)',
+            'title': 'Check-out Date',
+        },
+        'guests': {
+            'type': 'string',
+            'description': 'Number of guests',
+            'title': 'Number of Guests',
+        },
+        'room_type': {
+            'type': 'string',
+            'description': 'Type of room',
+            'title': 'Room Type',
+        },
+        'special_requests': {
+            'type': 'string',
+            'description': 'Special requests',
+            'title': 'Special Requests',
+        },
+    },
+    'required': ['hotel_name', 'city', 'checkin_date', 'checkout_date', 'guests'],
+}
+_HOTEL_FORM_UI_SCHEMA = {
+    'checkin_date': {'ui:widget': 'date'},
+    'checkout_date': {'ui:widget': 'date'},
+}
+
+_FLIGHT_FORM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'origin': {
+            'type': 'string',
+            'description': 'Departure city or airport',
+            'title': 'From',
+        },
+        'destination': {
+            'type': 'string',
+            'description': 'Destination city or airport',
+            'title': 'To',
+        },
+        'departure_date': {
+            'type': 'string',
+            'description': 'Departure date (YYYY-MM-DD)',
+            'title': 'Departure Date',
+        },
+        'return_date': {
+            'type': 'string',
+            'description': 'Return date (YYYY-MM-DD, optional)',
+            'title': 'Return Date',
+        },
+        'passengers': {
+            'type': 'string',
+            'description': 'Number of passengers',
+            'title': 'Passengers',
+        },
+        'travel_class': {
+            'type': 'string',
+            'description': 'Class of service',
+            'title': 'Travel Class',
+        },
+        'airline_preference': {
+            'type': 'string',
+            'description': 'Preferred airline',
+            'title': 'Airline Preference',
+        },
+    },
+    'required': ['origin', 'destination', 'departure_date', 'passengers'],
+}
+_FLIGHT_FORM_UI_SCHEMA = {
+    'departure_date': {'ui:widget': 'date'},
+    'return_date': {'ui:widget': 'date'},
+}
+
+_ITINERARY_FORM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'destination': {
+            'type': 'string',
+            'description': 'Main travel destination',
+            'title': 'Destination',
+        },
+        'start_date': {
+            'type': 'string',
+            'description': 'Trip start date (YYYY-MM-DD)',
+            'title': 'Start Date',
+        },
+        'end_date': {
+            'type': 'string',
+            'description': 'Trip end date (YYYY-MM-DD)',
+            'title': 'End Date',
+        },
+        'budget': {
+            'type': 'string',
+            'description': 'Budget level',
+            'title': 'Budget Level',
+            'enum': ['$', '$$', '$$$', '$$$$', '$$$$$'],
+        },
+        'travel_style': {
+            'type': 'string',
+            'description': 'Style of travel',
+            'title': 'Travel Style',
+            'enum': ['luxury', 'adventure', 'cultural', 'relaxed', 'balanced'],
+        },
+        'interests': {
+            'type': 'string',
+            'description': 'Your interests (food, history, nature, etc.)',
+            'title': 'Interests',
+        },
+        'special_requirements': {
+            'type': 'string',
+            'description': 'Special needs or requirements',
+            'title': 'Special Requirements',
+        },
+    },
+    'required': ['destination', 'start_date', 'end_date', 'budget'],
+}
+_ITINERARY_FORM_UI_SCHEMA = {
+    'start_date': {'ui:widget': 'date'},
+    'end_date': {'ui:widget': 'date'},
+}
+
+_GENERAL_FORM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'request': {
+            'type': 'string',
+            'description': 'Travel request details',
+            'title': 'Travel Request',
+        },
+    },
+    'required': ['request'],
+}
+
+
+# Form envelope for each form_type; unknown types get the generic form
+_FORM_ENVELOPES = {
+    'hotel_booking': {
+        'type': 'form',
+        'form': _HOTEL_FORM_SCHEMA,
+        'uiSchema': _HOTEL_FORM_UI_SCHEMA,
+    },
+    'flight_booking': {
+        'type': 'form',
+        'form': _FLIGHT_FORM_SCHEMA,
+        'uiSchema': _FLIGHT_FORM_UI_SCHEMA,
+    },
+    'comprehensive_itinerary': {
+        'type': 'form',
+        'form': _ITINERARY_FORM_SCHEMA,
+        'uiSchema': _ITINERARY_FORM_UI_SCHEMA,
+    },
+}
+_GENERAL_FORM_ENVELOPE = {
+    'type': 'form',
+    'form': _GENERAL_FORM_SCHEMA,
+}
+
+
 def return_booking_form(
     form_data: Dict[str, Any],
     tool_context: ToolContext,
@@ -860,187 +1257,59 @@ def return_booking_form(
         Dict[str, Any]: A JSON dictionary for the form response
     """
     if isinstance(form_data, str):
-        form_data = json.loads(form_data)
+        form_data = json_loads(form_data)
 
     tool_context.actions.skip_summarization = True
     tool_context.actions.escalate = True
     
     form_type = form_data.get('form_type', 'general')
     
-    if form_type == 'hotel_booking':
-        form_dict = {
-            'type': 'form',
-            'form': {
-                'type': 'object',
-                'properties': {
-                    'hotel_name': {
-                        'type': 'string',
-                        'description': 'Hotel name',
-                        'title': 'Hotel Name',
-                    },
-                    'city': {
-                        'type': 'string',
-                        'description': 'City where the hotel is located',
-                        'title': 'City',
-                    },
-                    'checkin_date': {
-                        'type': 'string',
-                        'description': 'Check-in date (YYYY-MM-DD)',
-                        'title': 'Check-in Date',
-                    },
-                    'checkout_date': {
-                        'type': 'string',
-                        'description': 'Check-out date (YYYY-MM-DD)',
-                        'title': 'Check-out Date',
-                    },
-                    'guests': {
-                        'type': 'string',
-                        'description': 'Number of guests',
-                        'title': 'Number of Guests',
-                    },
-                    'room_type': {
-                        'type': 'string',
-                        'description': 'Type of room',
-                        'title': 'Room Type',
-                    },
-                    'special_requests': {
-                        'type': 'string',
-                        'description': 'Special requests',
-                        'title': 'Special Requests',
-                    },
-                },
-                'required': ['hotel_name', 'city', 'checkin_date', 'checkout_date', 'guests'],
-            },
-            'uiSchema': {
-                'checkin_date': {'ui:widget': 'date'},
-                'checkout_date': {'ui:widget': 'date'},
-            },
-            'formData': form_data,
-        }
-    elif form_type == 'flight_booking':
-        form_dict = {
-            'type': 'form',
-            'form': {
-                'type': 'object',
-                'properties': {
-                    'origin': {
-                        'type': 'string',
-                        'description': 'Departure city or airport',
-                        'title': 'From',
-                    },
-                    'destination': {
-                        'type': 'string',
-                        'description': 'Destination city or airport',
-                        'title': 'To',
-                    },
-                    'departure_date': {
-                        'type': 'string',
-                        'description': 'Departure date (YYYY-MM-DD)',
-                        'title': 'Departure Date',
-                    },
-                    'return_date': {
-                        'type': 'string',
-                        'description': 'Return date (YYYY-MM-DD, optional)',
-                        'title': 'Return Date',
-                    },
-                    'passengers': {
-                        'type': 'string',
-                        'description': 'Number of passengers',
-                        'title': 'Passengers',
-                    },
-                    'travel_class': {
-                        'type': 'string',
-                        'description': 'Class of service',
-                        'title': 'Travel Class',
-                    },
-                    'airline_preference': {
-                        'type': 'string',
-                        'description': 'Preferred airline',
-                        'title': 'Airline Preference',
-                    },
-                },
-                'required': ['origin', 'destination', 'departure_date', 'passengers'],
-            },
-            'uiSchema': {
-                'departure_date': {'ui:widget': 'date'},
-                'return_date': {'ui:widget': 'date'},
-            },
-            'formData': form_data,
-        }
-    elif form_type == 'comprehensive_itinerary':
-        form_dict = {
-            'type': 'form',
-            'form': {
-                'type': 'object',
-                'properties': {
-                    'destination': {
-                        'type': 'string',
-                        'description': 'Main travel destination',
-                        'title': 'Destination',
-                    },
-                    'start_date': {
-                        'type': 'string',
-                        'description': 'Trip start date (YYYY-MM-DD)',
-                        'title': 'Start Date',
-                    },
-                    'end_date': {
-                        'type': 'string',
-                        'description': 'Trip end date (YYYY-MM-DD)',
-                        'title': 'End Date',
-                    },
-                    'budget': {
-                        'type': 'string',
-                        'description': 'Budget level',
-                        'title': 'Budget Level',
-                        'enum': ['$', '$$', '$$$', '$$$$', '$$$$$'],
-                    },
-                    'travel_style': {
-                        'type': 'string',
-                        'description': 'Style of travel',
-                        'title': 'Travel Style',
-                        'enum': ['luxury', 'adventure', 'cultural', 'relaxed', 'balanced'],
-                    },
-                    'interests': {
-                        'type': 'string',
-                        'description': 'Your interests (food, history, nature, etc.)',
-                        'title': 'Interests',
-                    },
-                    'special_requirements': {
-                        'type': 'string',
-                        'description': 'Special needs or requirements',
-                        'title': 'Special Requirements',
-                    },
-                },
-                'required': ['destination', 'start_date', 'end_date', 'budget'],
-            },
-            'uiSchema': {
-                'start_date': {'ui:widget': 'date'},
-                'end_date': {'ui:widget': 'date'},
-            },
-            'formData': form_data,
-        }
-    else:
-        # Generic form
-        form_dict = {
-            'type': 'form',
-            'form': {
-                'type': 'object',
-                'properties': {
-                    'request': {
-                        'type': 'string',
-                        'description': 'Travel request details',
-                        'title': 'Travel Request',
-                    },
-                },
-                'required': ['request'],
-            },
-            'formData': form_data,
-        }
+    # Deep copy so no response shares the module-level schema dicts
+    form_dict = copy.deepcopy(
+        _FORM_ENVELOPES.get(form_type, _GENERAL_FORM_ENVELOPE)
+    )
+    form_dict['formData'] = form_data
     
-    return form_dict 
+    return form_dict
+
+
+@functools.cache
+def _blockchain_settings() -> Optional[Tuple[str, str, int]]:
+    """Return (HOST_AGENT_APTOS_ADDRESS, APTOS_PRIVATE_KEY, max concurrent
+    submissions), or None if the address or key is unset.
+    
+    Read once, on the first booking; __main__ loads .env only after this
+    module is imported, so it cannot be read at import time.
+    """
+    host_agent_address = os.environ.get('HOST_AGENT_APTOS_ADDRESS')
+    if not host_agent_address:
+        logger.warning("HOST_AGENT_APTOS_ADDRESS not set, blockchain task completion disabled")
+        return None
+    aptos_private_key = os.environ.get('APTOS_PRIVATE_KEY')
+    if not aptos_private_key:
+        logger.warning("APTOS_PRIVATE_KEY not set, blockchain task completion disabled")
+        return None
+    max_concurrent = _DEFAULT_BLOCKCHAIN_CONCURRENCY
+    configured = os.environ.get('APTOS_MAX_CONCURRENT_TASKS')
+    if configured:
+        try:
+            max_concurrent = int(configured)
+            if max_concurrent < 1:
+                raise ValueError(configured)
+        except ValueError:
+            logger.warning(
+                "Invalid APTOS_MAX_CONCURRENT_TASKS %r, using %d",
+                configured, _DEFAULT_BLOCKCHAIN_CONCURRENCY,
+            )
+            max_concurrent = _DEFAULT_BLOCKCHAIN_CONCURRENCY
+    return host_agent_address, aptos_private_key, max_concurrent
 
-def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[Dict[str, Any]]:
-    """Complete task on Aptos blockchain using async context handling.
+
+async def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+    """Complete task on Aptos blockchain without blocking the caller's event loop.
+    
+    The transaction runs on the shared blockchain loop, so concurrent
+    bookings overlap their network round-trips.
     
     Args:
         tool_context (ToolContext): Tool context containing session information
@@ -1048,6 +1317,12 @@ def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[Dict[str
     Returns:
         Optional[Dict[str, Any]]: Blockchain completion result or None if failed
     """
+    # Completion is disabled for the whole process when not configured
+    settings = _blockchain_settings()
+    if settings is None:
+        return None
+    host_agent_address = settings[0]
+    
     try:
         # Get session_id from global agent instance
         session_id = _current_agent_instance.get_current_session_id() if _current_agent_instance else None
@@ -1055,28 +1330,14 @@ def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[Dict[str
         if not session_id:
             logger.warning("No session_id available for blockchain completion")
             return None
-            
-        # Get Host Agent address from environment
-        host_agent_address = os.environ.get('HOST_AGENT_APTOS_ADDRESS')
-        if not host_agent_address:
-            logger.warning("HOST_AGENT_APTOS_ADDRESS not set, cannot complete blockchain task")
-            return None
-        
-        # Handle async context (similar to food agent pattern)
-        def run_blockchain_task():
-            return asyncio.run(async_complete_task_on_blockchain(session_id, host_agent_address))
         
-        try:
-            # Try to get current event loop
-            loop = asyncio.get_running_loop()
-            # If we're in an event loop, use ThreadPoolExecutor
-            with ThreadPoolExecutor() as executor:
-                future = executor.submit(run_blockchain_task)
-                result = future.result(timeout=30)  # 30 second timeout
-                return result
-        except RuntimeError:
-            # No event loop running, use asyncio.run directly
-            return asyncio.run(async_complete_task_on_blockchain(session_id, host_agent_address))
+        future = asyncio.run_coroutine_threadsafe(
+            async_complete_task_on_blockchain(session_id, host_agent_address),
+            get_blockchain_loop(),
+        )
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future), timeout=30  # 30 second timeout
+        )
         
     except Exception as e:
         logger.error(f"Error completing task on blockchain: {e}")
@@ -1086,6 +1347,9 @@ def _complete_task_on_blockchain(tool_context: ToolContext) -> Optional[Dict[str
 async def async_complete_task_on_blockchain(session_id: str, host_agent_address: str) -> Optional[Dict[str, Any]]:
     """Async function to complete task on Aptos blockchain.
     
+    Must run on the blockchain loop. Concurrent calls for the same task join
+    the submission already in flight instead of sending their own.
+    
     Args:
         session_id (str): Current session ID
         host_agent_address (str): Host Agent Aptos address
@@ -1093,21 +1357,61 @@ async def async_complete_task_on_blockchain(session_id: str, host_agent_address:
     Returns:
         Optional[Dict[str, Any]]: Blockchain completion result
     """
+    key = (host_agent_address, session_id)
+    task = _pending_completions.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _submit_complete_task(session_id, host_agent_address)
+        )
+        _pending_completions[key] = task
+        task.add_done_callback(lambda _: _pending_completions.pop(key, None))
+    # A caller timing out must not cancel the submission other callers share
+    return await asyncio.shield(task)
+
+
+def _get_aptos_task_manager(aptos_private_key: str) -> 'AptosTaskManager':
+    """Return the shared AptosTaskManager, creating it on first use.
+    
+    Only called on the blockchain loop, so creation needs no lock. The Aptos
+    SDK is imported here, so search and form-only sessions never load it.
+    """
+    global _aptos_task_manager
+    if _aptos_task_manager is None:
+        from common.aptos_blockchain import AptosTaskManager
+        from common.aptos_config import AptosConfig
+
+        _aptos_task_manager = AptosTaskManager(
+            AptosConfig(private_key=aptos_private_key)
+        )
+    return _aptos_task_manager
+
+
+def _get_blockchain_semaphore(max_concurrent: int) -> asyncio.Semaphore:
+    """Return the semaphore bounding in-flight submissions, creating it on first use.
+    
+    Only called on the blockchain loop, so creation needs no lock.
+    """
+    global _blockchain_semaphore
+    if _blockchain_semaphore is None:
+        _blockchain_semaphore = asyncio.Semaphore(max_concurrent)
+    return _blockchain_semaphore
+
+
+async def _submit_complete_task(session_id: str, host_agent_address: str) -> Optional[Dict[str, Any]]:
+    """Submit one complete_task transaction and wait for it."""
     try:
-        # Initialize Aptos configuration
-        aptos_private_key = os.environ.get('APTOS_PRIVATE_KEY')
-        if not aptos_private_key:
-            logger.warning("APTOS_PRIVATE_KEY not set, cannot complete blockchain task")
+        settings = _blockchain_settings()
+        if settings is None:
             return None
-            
-        aptos_config = AptosConfig(private_key=aptos_private_key)
-        aptos_task_manager = AptosTaskManager(aptos_config)
+        _, aptos_private_key, max_concurrent = settings
+        aptos_task_manager = _get_aptos_task_manager(aptos_private_key)
         
         # Complete task on blockchain
-        result = await aptos_task_manager.complete_task(
-            task_agent_address=host_agent_address,
-            task_id=session_id
-        )
+        async with _get_blockchain_semaphore(max_concurrent):
+            result = await aptos_task_manager.complete_task(
+                task_agent_address=host_agent_address,
+                task_id=session_id
+            )
         
         if result.get('success'):
             logger.info(f"[APTOS NETWORK] complete_task 交易发送: {result.get('tx_hash')}")
@@ -1132,9 +1436,14 @@ class TravelAgent(AgentWithTaskManager):
 
     SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
 
+    # LlmAgent shared by every TravelAgent; built by the first instance
+    _shared_agent: ClassVar[Optional[LlmAgent]] = None
+
     def __init__(self):
         global _current_agent_instance
-        self._agent = self._build_agent()
+        if TravelAgent._shared_agent is None:
+            TravelAgent._shared_agent = self._build_agent()
+        self._agent = TravelAgent._shared_agent
         self._user_id = 'travel_agent'
         self._runner = Runner(
             app_name=self._agent.name,
@@ -1171,7 +1480,7 @@ class TravelAgent(AgentWithTaskManager):
 你是一个专业的旅游助手，为全球旅行者提供服务。你可以帮助用户规划行程、预订酒店、预订机票和创建完整的旅行计划。
 
 当用户询问目的地推荐时：
-1. 使用search_destinations()查找符合用户需求的目的地
+1. 使用search_destinations()查找符合用户需求的目的地；如果需要按多组条件查找，使用search_destinations_batch()一次完成
 2. 根据用户的预算、旅行时间和偏好提供个性化推荐
 3. 说明每个目的地的特色、最佳旅行季节和预算水平
 
@@ -1218,6 +1527,7 @@ class TravelAgent(AgentWithTaskManager):
 """,
             tools=[
                 search_destinations,
+                search_destinations_batch,
                 search_hotels,
                 search_flights,
                 get_weather_info,
@@ -26,9 +26,6 @@ from common.types import (
     TextPart,
 )
 from google.genai import types
-# Import Aptos related libraries
-from common.aptos_config import AptosConfig
-from common.aptos_blockchain import AptosTaskManager, AptosSignatureManager
 
 
 logger = logging.getLogger(__name__)
@@ -242,7 +239,11 @@ class AgentTaskManager(InMemoryTaskManager):
             # Get session ID which is used as task_id in Aptos
             session_id = task_send_params.sessionId
                 
-            # Initialize Aptos config and task manager for validation
+            # Initialize Aptos config and task manager for validation; the
+            # SDK is only imported once a request carries an Aptos task
+            from common.aptos_blockchain import AptosTaskManager
+            from common.aptos_config import AptosConfig
+
             aptos_config = AptosConfig()
             if not await aptos_config.is_connected():
                 return False, "Unable to connect to Aptos network"
@@ -0,0 +1,149 @@
+import itertools
+import unittest
+
+from agent import (
+    AIRLINES,
+    DESTINATIONS,
+    HOTELS,
+    search_destinations,
+    search_flights,
+    search_hotels,
+)
+
+
+def reference_search_destinations(region=None, budget=None, season=None, travel_type=None):
+    """The original linear-scan destination filter."""
+    results = []
+    if region and region.lower() in DESTINATIONS:
+        search_regions = [region.lower()]
+    else:
+        search_regions = DESTINATIONS.keys()
+    for region_name in search_regions:
+        for destination in DESTINATIONS[region_name]:
+            match = True
+            if budget and budget != destination['budget']:
+                match = False
+            if season and season.lower() not in destination['season'].lower():
+                match = False
+            if travel_type and travel_type.lower() not in destination['type'].lower():
+                match = False
+            if match:
+                result_destination = destination.copy()
+                result_destination['region'] = region_name
+                results.append(result_destination)
+    budget_order = {'$': 1, '$$': 2, '$$$': 3, '$$$$': 4, '$$$$$': 5}
+    results.sort(key=lambda x: (budget_order.get(x['budget'], 3), x['name']))
+    return results[:15]
+
+
+def reference_search_hotels(city=None, hotel_type=None, budget=None, amenities=None):
+    """The original linear-scan hotel filter."""
+    results = []
+    if hotel_type and hotel_type.lower() in HOTELS:
+        search_categories = [hotel_type.lower()]
+    else:
+        search_categories = HOTELS.keys()
+    for category in search_categories:
+        for hotel in HOTELS[category]:
+            match = True
+            if city and city.lower() not in hotel['location'].lower() and hotel['location'] != 'Global':
+                match = False
+            if budget and budget != hotel['price_range']:
+                match = False
+            if amenities:
+                amenity_keywords = amenities.lower().split()
+                hotel_amenities = ' '.join(hotel['amenities']).lower()
+                if not any(keyword in hotel_amenities for keyword in amenity_keywords):
+                    match = False
+            if match:
+                result_hotel = hotel.copy()
+                result_hotel['category'] = category
+                results.append(result_hotel)
+    return results
+
+
+def reference_search_flights(origin=None, destination=None, departure_date=None, travel_class=None, airline_type=None):
+    """The original linear-scan flight filter."""
+    results = []
+    if airline_type and airline_type in AIRLINES:
+        search_categories = [airline_type]
+    else:
+        search_categories = AIRLINES.keys()
+    for category in search_categories:
+        for airline in AIRLINES[category]:
+            if travel_class and not any(
+                travel_class.lower() in class_option.lower()
+                for class_option in airline['class_options']
+            ):
+                continue
+            result_airline = airline.copy()
+            result_airline['category'] = category
+            if origin and destination:
+                result_airline['route'] = f'{origin} -> {destination}'
+                if departure_date:
+                    result_airline['departure_date'] = departure_date
+                result_airline['estimated_duration'] = '8-15 hours (varies by route)'
+                result_airline['price_estimate'] = '$500-$3000 (varies by class and route)'
+            results.append(result_airline)
+    return results
+
+
+BUDGETS = [None, '', '$', '$$', '$$$', '$$$$', 'x']
+
+
+class SearchDestinationsTest(unittest.TestCase):
+    """The destination indexes must return what the linear filter returned."""
+
+    def test_matches_reference_filter(self) -> None:
+        """Every filter combination, including case and substring matches."""
+        regions = [None, '', 'asia', 'Europe', 'AMERICAS', 'oceania', 'mars']
+        seasons = [None, '', 'spring', 'Summer', 'FALL', 'year', '/', 'dry', 's', 'zzz']
+        types = [None, '', 'city', 'Island', 'HISTORIC', 'adventure', 'c', 'zz']
+        for args in itertools.product(regions, BUDGETS, seasons, types):
+            with self.subTest(args=args):
+                self.assertEqual(
+                    search_destinations(*args),
+                    reference_search_destinations(*args),
+                )
+
+    def test_cached_results_are_independent(self) -> None:
+        """Mutating a returned result must not leak into later searches."""
+        search_destinations('asia')[0]['name'] = 'changed'
+        self.assertEqual(
+            search_destinations('asia'), reference_search_destinations('asia')
+        )
+
+
+class SearchHotelsTest(unittest.TestCase):
+    """The hotel indexes must return what the linear filter returned."""
+
+    def test_matches_reference_filter(self) -> None:
+        """Every filter combination, including 'Global' hotels and amenity words."""
+        cities = [None, '', 'tokyo', 'Paris', 'NEW YORK', 'york', 'global', 'z']
+        hotel_types = [None, '', 'luxury', 'Business', 'BUDGET', 'boutique', 'x']
+        amenities = [None, '', ' ', 'spa', 'Pool fitness', 'WIFI breakfast', 'a', 'zzz']
+        for args in itertools.product(cities, hotel_types, BUDGETS, amenities):
+            with self.subTest(args=args):
+                self.assertEqual(
+                    search_hotels(*args), reference_search_hotels(*args)
+                )
+
+
+class SearchFlightsTest(unittest.TestCase):
+    """The airline indexes must return what the linear filter returned."""
+
+    def test_matches_reference_filter(self) -> None:
+        """Every filter combination, including class substrings and routes."""
+        places = [None, '', 'NYC']
+        dates = [None, '2025-01-01']
+        classes = [None, '', 'economy', 'Business', 'FIRST', 'premium', 'e', 'zz']
+        airline_types = [None, '', 'low_cost', 'major_international', 'Low_Cost']
+        for args in itertools.product(places, places, dates, classes, airline_types):
+            with self.subTest(args=args):
+                self.assertEqual(
+                    search_flights(*args), reference_search_flights(*args)
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
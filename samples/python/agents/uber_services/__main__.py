@@ -2,9 +2,9 @@ import logging
 import os
 
 import click
-from common.aptos_config import AptosConfig
 
 from agent import UberAgent
+from common.aptos_config import derive_aptos_address
 from common.server import A2AServer
 from common.types import (
     AgentCapabilities,
@@ -55,8 +55,7 @@ def main(host, port, verify_signatures, aptos_address):
             aptos_private_key = os.environ.get('APTOS_PRIVATE_KEY')
             if aptos_private_key:
                 try:
-                    aptos_config = AptosConfig(private_key=aptos_private_key)
-                    aptos_address = str(aptos_config.address)
+                    aptos_address = derive_aptos_address(aptos_private_key)
                     logger.info(f"Generated aptos_address from APTOS_PRIVATE_KEY: {aptos_address}")
                 except Exception as e:
                     logger.error(f"Error generating Aptos address from private key: {e}")
@@ -2,6 +2,7 @@
 
 提供Aptos网络连接、账户管理和合约配置功能。
 """
+import functools
 import logging
 import os
 from typing import Optional
@@ -15,6 +16,22 @@ logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
+def load_account(private_key_hex: str) -> Account:
+    """从私钥加载账户，支持 'ed25519-priv-0x' 和 '0x' 前缀"""
+    # 移除各种前缀（如果存在）
+    if private_key_hex.startswith('ed25519-priv-0x'):
+        private_key_hex = private_key_hex[15:]  # 移除 'ed25519-priv-0x'
+    elif private_key_hex.startswith('0x'):
+        private_key_hex = private_key_hex[2:]   # 移除 '0x'
+    return Account.load_key(private_key_hex)
+
+
+@functools.cache
+def derive_aptos_address(private_key_hex: str) -> str:
+    """仅从私钥推导账户地址（每个私钥只计算一次），不创建RestClient"""
+    return str(load_account(private_key_hex).address())
+
+
 class AptosConfig:
     """Aptos区块链配置类"""
     
@@ -26,12 +43,7 @@ class AptosConfig:
         # 账户配置
         private_key_hex = private_key or os.getenv('APTOS_PRIVATE_KEY')
         if private_key_hex:
-            # 移除各种前缀（如果存在）
-            if private_key_hex.startswith('ed25519-priv-0x'):
-                private_key_hex = private_key_hex[15:]  # 移除 'ed25519-priv-0x'
-            elif private_key_hex.startswith('0x'):
-                private_key_hex = private_key_hex[2:]   # 移除 '0x'
-            self.account = Account.load_key(private_key_hex)
+            self.account = load_account(private_key_hex)
             self.address = self.account.address()
         else:
             self.account = None
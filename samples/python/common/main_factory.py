@@ -0,0 +1,174 @@
+"""Shared command-line entry point for the ADK sample agents.
+
+`build_and_serve` wires an agent, its task manager and its AgentCard into an
+A2AServer. Each agent's `__main__` loads its own `.env` before calling it, so
+environment settings are read when the server starts, not at import.
+"""
+import functools
+import logging
+import os
+
+from collections.abc import Callable
+from typing import Any
+
+import click
+
+from common.server import A2AServer
+from common.types import AgentCard, MissingAPIKeyError
+
+
+# Address advertised when no Aptos private key is configured
+DEFAULT_APTOS_ADDRESS = '0x123456789abcdef0123456789abcdef012345678'
+
+logger = logging.getLogger(__name__)
+
+# Reduce Google ADK and related library logs
+_QUIET_LOGGERS = (
+    'google.adk.models.google_llm',
+    'google_genai.models',
+    'google_genai.types',
+    'httpx',
+    'uvicorn.access',
+)
+
+# Keep important logs
+_VERBOSE_LOGGERS = (
+    '__main__',
+    __name__,
+    'task_manager',
+    'common.server.task_manager',
+)
+
+
+def _quiet_library_loggers() -> None:
+    """Silence chatty library loggers while keeping the agent's own logs."""
+    for name in _QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.ERROR)
+    for name in _VERBOSE_LOGGERS:
+        logging.getLogger(name).setLevel(logging.INFO)
+
+    # Access logs are already filtered to errors; skip the root handler chain
+    logging.getLogger('uvicorn.access').propagate = False
+
+
+def _resolve_aptos_address() -> str:
+    """Derive the agent's Aptos address from APTOS_PRIVATE_KEY."""
+    aptos_private_key = os.environ.get('APTOS_PRIVATE_KEY')
+    if not aptos_private_key:
+        logger.warning('APTOS_PRIVATE_KEY not set, using default aptos_address')
+        return DEFAULT_APTOS_ADDRESS
+
+    # Only agents that settle on Aptos pay for the SDK import
+    from common.aptos_config import derive_aptos_address
+
+    try:
+        aptos_address = derive_aptos_address(aptos_private_key)
+        logger.info(
+            'Generated aptos_address from APTOS_PRIVATE_KEY: %s', aptos_address
+        )
+        return aptos_address
+    except Exception as e:
+        logger.error('Error generating Aptos address from private key: %s', e)
+        return DEFAULT_APTOS_ADDRESS
+
+
+@functools.cache
+def _build_agent_card(
+    agent_card_builder: Callable[[str, int], AgentCard], host: str, port: int
+) -> AgentCard:
+    """Build the AgentCard once per builder, host and port."""
+    return agent_card_builder(host, port)
+
+
+def build_and_serve(
+    agent_cls: Callable[[], Any],
+    task_manager_cls: Callable[..., Any],
+    agent_card_builder: Callable[[str, int], AgentCard],
+    default_port: int,
+    needs_aptos: bool = False,
+    log_level: int = logging.INFO,
+    quiet_loggers: bool = False,
+) -> None:
+    """Parse the command line and serve the agent over A2A.
+
+    Args:
+        agent_cls: Agent class, instantiated once with no arguments.
+        task_manager_cls: Task manager class taking `agent` and
+            `verify_signatures` keyword arguments.
+        agent_card_builder: Builds the AgentCard from the host and port.
+        default_port: Port used when `--port` is not given.
+        needs_aptos: Whether the agent advertises and settles with an Aptos
+            address; adds the `--aptos-address` option.
+        log_level: Root logging level.
+        quiet_loggers: Whether to raise Google ADK, genai, httpx and
+            uvicorn access loggers to ERROR.
+    """
+    logging.basicConfig(level=log_level)
+    if quiet_loggers:
+        _quiet_library_loggers()
+
+    def serve(host, port, verify_signatures, aptos_address=None):
+        try:
+            # Check for API key only if Vertex AI is not configured
+            use_vertexai = os.getenv('GOOGLE_GENAI_USE_VERTEXAI') == 'TRUE'
+            if not use_vertexai and not os.getenv('GOOGLE_API_KEY'):
+                raise MissingAPIKeyError(
+                    'GOOGLE_API_KEY environment variable not set and GOOGLE_GENAI_USE_VERTEXAI is not TRUE.'
+                )
+
+            agent_card = _build_agent_card(agent_card_builder, host, port)
+            if needs_aptos:
+                aptos_address = aptos_address or _resolve_aptos_address()
+                # The cached card is shared; advertise the address on a copy
+                agent_card = agent_card.model_copy(
+                    update={
+                        'metadata': {
+                            **(agent_card.metadata or {}),
+                            'aptos_address': aptos_address,
+                        }
+                    }
+                )
+
+            # Initialize the task manager with signature verification
+            logger.info(
+                'Initializing AgentTaskManager with signature verification: %s',
+                verify_signatures,
+            )
+            task_manager = task_manager_cls(
+                agent=agent_cls(), verify_signatures=verify_signatures
+            )
+            if needs_aptos:
+                task_manager.agent_address = aptos_address
+                logger.info('Agent aptos address set to: %s', aptos_address)
+                # Also set it as environment variable for easier access
+                os.environ['AGENT_APTOS_ADDRESS'] = aptos_address
+
+            server = A2AServer(
+                agent_card=agent_card,
+                task_manager=task_manager,
+                host=host,
+                port=port,
+            )
+            server.start()
+        except MissingAPIKeyError as e:
+            logger.error(f'Error: {e}')
+            exit(1)
+        except Exception as e:
+            logger.error(f'An error occurred during server startup: {e}')
+            exit(1)
+
+    if needs_aptos:
+        serve = click.option(
+            '--aptos-address',
+            default=None,
+            help='Aptos address for Remote Agent (optional)',
+        )(serve)
+    serve = click.option(
+        '--verify-signatures',
+        is_flag=True,
+        default=True,
+        help='Enable signature verification',
+    )(serve)
+    serve = click.option('--port', default=default_port)(serve)
+    serve = click.option('--host', default='localhost')(serve)
+    click.command()(serve)()
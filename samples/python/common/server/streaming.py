@@ -0,0 +1,68 @@
+"""Bounded read-ahead for agent response streams."""
+
+import asyncio
+
+from collections.abc import AsyncIterable, Callable
+from typing import Generic, TypeVar
+
+
+T = TypeVar('T')
+
+# Marks the end of the source stream on the read-ahead queue
+_END = object()
+
+
+class BufferedStream(Generic[T]):
+    """Async iterator that reads `source` ahead into a bounded queue.
+
+    A producer task keeps pulling from `source` while the consumer handles
+    earlier items, so an agent keeps generating while its previous updates
+    are stored and written out. The producer stops after an item for which
+    `is_last` returns true; an exception raised by `source` is re-raised to
+    the consumer. Call `close` once done to cancel the producer.
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterable[T],
+        maxsize: int = 8,
+        is_last: Callable[[T], bool] | None = None,
+    ):
+        self._source = source
+        self._is_last = is_last
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._producer: asyncio.Task | None = None
+        self._error: Exception | None = None
+        self._done = False
+
+    async def _produce(self) -> None:
+        try:
+            async for item in self._source:
+                await self._queue.put(item)
+                if self._is_last is not None and self._is_last(item):
+                    break
+        except Exception as e:
+            self._error = e
+        await self._queue.put(_END)
+
+    def __aiter__(self) -> 'BufferedStream[T]':
+        return self
+
+    async def __anext__(self) -> T:
+        if self._done:
+            raise StopAsyncIteration
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce())
+        item = await self._queue.get()
+        if item is _END:
+            self._done = True
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+        return item
+
+    def close(self) -> None:
+        """Stop reading ahead; items still queued are dropped."""
+        self._done = True
+        if self._producer is not None:
+            self._producer.cancel()
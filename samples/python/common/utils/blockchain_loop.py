@@ -0,0 +1,25 @@
+"""Background event loop for Aptos blockchain calls."""
+
+import asyncio
+import threading
+
+from typing import Optional
+
+
+# Event loop run forever on a daemon thread, so the Aptos client and its
+# pooled connections survive across requests; started on first use
+_blockchain_loop: Optional[asyncio.AbstractEventLoop] = None
+_blockchain_loop_lock = threading.Lock()
+
+
+def get_blockchain_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop for blockchain calls, starting it on first use."""
+    global _blockchain_loop
+    with _blockchain_loop_lock:
+        if _blockchain_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name='aptos-loop', daemon=True
+            ).start()
+            _blockchain_loop = loop
+    return _blockchain_loop
@@ -0,0 +1,21 @@
+"""JSON helpers that use orjson when it is installed."""
+
+import json
+
+from typing import Any
+
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize obj to compact JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'))